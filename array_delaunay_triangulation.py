@@ -0,0 +1,356 @@
+from time import perf_counter
+
+import numpy as np
+
+from edge import Edge
+from edge_arena import EdgeArena
+from predicates import ORIENT2D_ERROR_BOUND, INCIRCLE_ERROR_BOUND, orient2d_exact, incircle_exact
+import triangulation_stats
+
+
+CUT_STRATEGIES = ('vertical', 'alternating')  # Способи поділу множини точок на кожному кроці
+ADAPTIVE_CUT_MIN_POINTS = 64  # Менші підзадачі при 'alternating' не вибирають вісь заново (це дорожче за виграш)
+
+
+def compute_delaunay_edges(points, cut_strategy='vertical', stats=False, integer=None):
+    """Повертає список ребер, які утворюють триангуляцію Делоне для набору точок.
+    Те саме, що й delaunay_triangulation.compute_delaunay_edges, але ребра зберігаються в EdgeArena.
+    cut_strategy: 'vertical' - завжди ділимо за x, 'alternating' - ріжемо поперек довшої сторони підзадачі
+    stats=True: повертає пару (ребра, TriangulationStats) з часом фаз і лічильниками операцій
+    integer=True: координати цілі, обчислення точні в цілих числах (None - якщо points мають цілий тип)"""
+    if integer is None:
+        integer = is_integer_array(points)
+    if stats:
+        return compute_delaunay_edges_with_stats(points, cut_strategy, integer)
+
+    points, _ = sort_unique_points(points, integer)
+    arena = triangulate_points(points, cut_strategy)
+    return arena_edges(points, arena)
+
+
+def compute_delaunay_edges_with_stats(points, cut_strategy='vertical', integer=False):
+    """compute_delaunay_edges з тимчасово підміненими функціями, що збирають статистику"""
+    stats = triangulation_stats.TriangulationStats()
+    start_time = perf_counter()
+    with triangulation_stats.instrumented(stats):
+        points, _ = sort_unique_points(points, integer)
+        arena = triangulate_points(points, cut_strategy)
+    output_time = perf_counter()
+    edges = arena_edges(points, arena)
+    stats.phase_times['output'] = perf_counter() - output_time
+    stats.phase_times['total'] = perf_counter() - start_time
+    stats.record_arena(arena)
+    return edges, stats
+
+
+def arena_edges(points, arena):
+    """Об'єкти Edge для ребер, що залишились у триангуляції; точки - кортежі чисел, як у delaunay_triangulation
+    (рядки масиву numpy як точки ребер створюються значно повільніше)"""
+    points = list(map(tuple, points.tolist()))
+    pairs = arena.edge_index_pairs()
+    return [Edge(points[start], points[end]) for start, end in zip(pairs[:, 0].tolist(), pairs[:, 1].tolist())]
+
+
+def is_integer_array(points):
+    """Чи мають координати points цілий тип (наприклад, пікселі або вузли сітки)"""
+    return np.issubdtype(np.asarray(points).dtype, np.integer)
+
+
+def sort_unique_points(points, integer=False):
+    """Сортує точки за x (y є вирішувачем при рівних x) та видаляє дублікати.
+    Повертає відсортовані унікальні точки та індекси цих точок у вхідному масиві.
+    integer=True: точки повертаються як int64 (нецілі координати - помилка)"""
+    if integer:
+        return sort_unique_integer_points(points)
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    order = np.lexsort((points[:, 1], points[:, 0]))  # Останній ключ lexsort є основним
+    points = points[order]
+    unique = np.ones(len(points), dtype=bool)
+    unique[1:] = np.any(points[1:] != points[:-1], axis=1)  # Дублікат збігається з попередньою точкою
+    return points[unique], order[unique]
+
+
+def sort_unique_integer_points(points):
+    """sort_unique_points для цілих координат: якщо діапазон дозволяє, точка (x, y) замінюється одним
+    ключем (x - min_x) * height + (y - min_y) з тим самим порядком, і сортуються та порівнюються лише ключі"""
+    points = np.asarray(points).reshape(-1, 2)
+    if not np.issubdtype(points.dtype, np.integer):
+        if not np.array_equal(points, np.round(points)):
+            raise ValueError("Координати точок мають бути цілими")
+    points = points.astype(np.int64)
+    if not len(points):
+        return points, np.arange(0)
+
+    lower, upper = points.min(axis=0), points.max(axis=0)
+    width, height = int(upper[0]) - int(lower[0]) + 1, int(upper[1]) - int(lower[1]) + 1
+    if width * height <= 2 ** 63:
+        keys = (points[:, 0] - lower[0]).astype(np.uint64) * np.uint64(height) + (points[:, 1] - lower[1]).astype(np.uint64)
+        order = np.argsort(keys, kind='stable')
+        keys = keys[order]
+        unique = np.r_[True, keys[1:] != keys[:-1]]
+    else:
+        order = np.lexsort((points[:, 1], points[:, 0]))
+        unique = np.r_[True, np.any(points[order][1:] != points[order][:-1], axis=1)]
+    return points[order[unique]], order[unique]
+
+
+def triangulate_points(points, cut_strategy='vertical'):
+    """Будує триангуляцію Делоне для відсортованих унікальних точок і повертає EdgeArena з її ребрами
+    (без ребер, якщо точок менше двох, наприклад, коли всі вхідні точки однакові)"""
+    arena = EdgeArena(points)
+    if len(arena) >= 2:
+        delaunay_triangulate(arena, cut_strategy)
+    return arena
+
+
+def delaunay_triangulate(arena, cut_strategy='vertical'):
+    """Обчислює триангуляцію Делоне для всіх точок arena і повертає два ребра (left_edge і right_edge).
+    left_edge: перше ребро проти годинникової стрілки, що належить ОО та виходить з найлівішої точки ОО
+    right_edge: перше ребро за годинниковою стрілкою, що належить ОО та виходить з найправішої точки ОО
+
+    Замість рекурсії використовується явний стек задач, тому глибина поділу не обмежена.
+    При cut_strategy='alternating' кожна підзадача ділиться поперек довшої сторони свого обмежувального
+    прямокутника (Dwyer), тож на рівномірних даних розрізи чергуються, а довгу тонку смугу ріжемо лише вертикально;
+    підзадачі з не більше ніж ADAPTIVE_CUT_MIN_POINTS точками ріжемо по осі батьківської.
+    Горизонтальний розріз - це вертикальний розріз у системі координат, поверненій на 90 градусів
+    (ключ порівняння (y, -x)), а предикати орієнтації від повороту не залежать"""
+    if cut_strategy not in CUT_STRATEGIES:
+        raise ValueError("Невідомий спосіб поділу: {}".format(cut_strategy))
+    alternating = cut_strategy == 'alternating'
+    count = len(arena)
+    order = np.arange(count)  # Точки піддіапазону order[first:last] утворюють одну підзадачу
+    if alternating:
+        # Ранги точок у порядку (y, -x); для порядку (x, y) рангом є сам індекс відсортованої точки
+        points = np.array(arena.coordinates())  # Копія, щоб не тримати буфер arena.points
+        y_rank = np.empty(count, dtype=np.int64)
+        y_rank[np.lexsort((-points[:, 0], points[:, 1]))] = np.arange(count)
+        ranks = (None, y_rank)
+
+    # Предикати читають координати зі списку, а не з array (див. EdgeArena.unpacked_points)
+    with arena.unpacked_points():
+        tasks = [(0, count, 0, False)]  # (first, last, axis, merge_pending)
+        handles = []  # Трійки (left_edge, right_edge, axis) уже обчислених підзадач: крайні точки за віссю axis
+        while tasks:
+            first, last, axis, merge_pending = tasks.pop()
+            if merge_pending:
+                right_inner_edge, right_outer_edge, right_axis = handles.pop()
+                left_outer_edge, left_inner_edge, left_axis = handles.pop()
+                # Підзадачі, поділені по іншій осі, повернули крайні точки за нею, тому шукаємо їх заново
+                if left_axis != axis:
+                    left_outer_edge, left_inner_edge = find_extreme_edges(arena, left_outer_edge, left_inner_edge, ranks[axis])
+                if right_axis != axis:
+                    right_inner_edge, right_outer_edge = find_extreme_edges(arena, right_inner_edge, right_outer_edge, ranks[axis])
+                handles.append(merge_halves(arena, left_outer_edge, left_inner_edge, right_inner_edge, right_outer_edge) + (axis,))
+                continue
+
+            if last - first <= 3:
+                leaf = order[first:last]
+                if axis:
+                    leaf = leaf[np.argsort(y_rank[leaf])]
+                handles.append(triangulate_leaf(arena, leaf.tolist()) + (axis,))
+                continue
+
+            midpoint = first + (last - first + 1) // 2  # Індекс першої точки правої частини
+            if alternating and last - first > ADAPTIVE_CUT_MIN_POINTS:
+                segment = order[first:last]
+                extent = np.ptp(points[segment], axis=0)
+                axis = int(extent[1] > extent[0])  # Ріжемо поперек довшої сторони
+                keys = segment if axis == 0 else y_rank[segment]
+                order[first:last] = segment[np.argpartition(keys, midpoint - first - 1)]
+            elif axis:
+                # Малі підзадачі ріжемо по осі батьківської задачі
+                segment = order[first:last]
+                order[first:last] = segment[np.argpartition(y_rank[segment], midpoint - first - 1)]
+            tasks.append((first, last, axis, True))
+            tasks.append((midpoint, last, axis, False))
+            tasks.append((first, midpoint, axis, False))
+
+        left_edge, right_edge, axis = handles.pop()
+        if axis:
+            # Корінь поділено горизонтально: повертаємо крайні точки за x, як і для вертикальних розрізів
+            left_edge, right_edge = find_extreme_edges(arena, left_edge, right_edge, None)
+    return left_edge, right_edge
+
+
+def triangulate_leaf(arena, leaf):
+    """Триангуляція двох або трьох точок, упорядкованих за ключем поділу"""
+    if len(leaf) == 2:
+        edge_a = arena.create_new_edge(leaf[0], leaf[1])
+        return edge_a, arena.symmetric_edge[edge_a]
+    return triangulate_three_points(arena, leaf[0], leaf[1], leaf[2])
+
+
+def find_extreme_edges(arena, left_edge, right_edge, rank):
+    """Обходить ОО і повертає пару (left_edge, right_edge) для крайніх точок за рангом rank
+    (rank=None означає, що рангом є сам індекс точки)"""
+    start_index, symmetric_edge = arena.start_index, arena.symmetric_edge
+    next_edge_ccw, prev_edge_cw = arena.next_edge_ccw, arena.prev_edge_cw
+    key = (lambda point: point) if rank is None else rank.__getitem__
+
+    edge, best_edge, best_key = left_edge, left_edge, key(start_index[left_edge])
+    while True:
+        edge = prev_edge_cw[symmetric_edge[edge]]  # Наступне ребро ОО тієї ж орієнтації
+        if edge == left_edge:
+            break
+        edge_key = key(start_index[edge])
+        if edge_key < best_key:
+            best_edge, best_key = edge, edge_key
+    left_edge = best_edge
+
+    edge, best_edge, best_key = right_edge, right_edge, key(start_index[right_edge])
+    while True:
+        edge = next_edge_ccw[symmetric_edge[edge]]
+        if edge == right_edge:
+            break
+        edge_key = key(start_index[edge])
+        if edge_key > best_key:
+            best_edge, best_key = edge, edge_key
+    return left_edge, best_edge
+
+
+def merge_halves(arena, left_outer_edge, left_inner_edge, right_inner_edge, right_outer_edge):
+    """Зшиває дві сусідні триангуляції і повертає ребра left_edge і right_edge об'єднання"""
+    start_index, symmetric_edge = arena.start_index, arena.symmetric_edge
+
+    # Обчислюємо верхню спільну опорну лівих і правих точок
+    left_inner_edge, right_inner_edge = compute_upper_common_tangent(arena, left_inner_edge, right_inner_edge)
+
+    # Створюємо перше ребро base_edge, яке з'єднує початкові точки right_inner_edge та left_inner_edge
+    base_edge = arena.connect_edges(symmetric_edge[left_inner_edge], right_inner_edge)
+
+    # Коригуємо left_outer_edge і right_outer_edge, якщо необхідно
+    if start_index[left_inner_edge] == start_index[left_outer_edge]:
+        left_outer_edge = base_edge
+    if start_index[right_inner_edge] == start_index[right_outer_edge]:
+        right_outer_edge = symmetric_edge[base_edge]
+
+    merge(arena, base_edge)
+    return left_outer_edge, right_outer_edge
+
+
+def triangulate_three_points(arena, point1, point2, point3):
+    """Обчислює триангуляцію для трьох точок і повертає два ребра"""
+    edge_a = arena.create_new_edge(point1, point2)
+    edge_b = arena.create_new_edge(point2, point3)
+    arena.splice_edges(arena.symmetric_edge[edge_a], edge_b)
+
+    # Замкнемо трикутник
+    if is_right_of(arena, point3, point1, point2):
+        arena.connect_edges(edge_b, edge_a)
+        return edge_a, arena.symmetric_edge[edge_b]
+    elif is_left_of(arena, point3, point1, point2):
+        edge_c = arena.connect_edges(edge_b, edge_a)
+        return arena.symmetric_edge[edge_c], edge_c
+    else:  # Якщо три точки колінеарні
+        return edge_a, arena.symmetric_edge[edge_b]
+
+
+def compute_upper_common_tangent(arena, leftmost_edge, rightmost_edge):
+    """Обчислює верхню спільну опорну двох множин ребер"""
+    # Симетричне ребро - сусідня комірка пари (edge ^ 1): дешевше, ніж читати arena.symmetric_edge
+    start_index, next_edge_ccw, prev_edge_cw = arena.start_index, arena.next_edge_ccw, arena.prev_edge_cw
+    right_of, left_of = is_right_of, is_left_of  # Зв'язуємо під час виклику, щоб підміна з triangulation_stats діяла
+    while True:
+        left_start, right_start = start_index[leftmost_edge], start_index[rightmost_edge]
+        if right_of(arena, right_start, left_start, start_index[leftmost_edge ^ 1]):
+            leftmost_edge = next_edge_ccw[leftmost_edge ^ 1]
+        elif left_of(arena, left_start, right_start, start_index[rightmost_edge ^ 1]):
+            rightmost_edge = prev_edge_cw[rightmost_edge ^ 1]
+        else:
+            break
+    return leftmost_edge, rightmost_edge
+
+
+def merge(arena, base_edge):
+    """Об'єднує два набори ребер з новим ребром base_edge"""
+    start_index, next_edge_ccw, prev_edge_cw = arena.start_index, arena.next_edge_ccw, arena.prev_edge_cw
+    remove_edge, connect_edges = arena.remove_edge, arena.connect_edges
+    right_of, in_circumcircle = is_right_of, is_point_in_circumcircle  # Зв'язуємо під час виклику, як і вище
+    while True:
+        base_sym = base_edge ^ 1  # Симетричне ребро - сусідня комірка пари
+        base_start, base_end = start_index[base_edge], start_index[base_sym]
+        right_candidate, left_candidate = next_edge_ccw[base_sym], prev_edge_cw[base_edge]
+        right_end, left_end = start_index[right_candidate ^ 1], start_index[left_candidate ^ 1]
+
+        # Якщо лівий і правий кандидати недійсні, тоді base_edge є нижньою спільною опорною.
+        valid_right_candidate = right_of(arena, right_end, base_start, base_end)
+        valid_left_candidate = right_of(arena, left_end, base_start, base_end)
+        if not (valid_right_candidate or valid_left_candidate):
+            break
+
+        # Видаляємо ребра правого кандидата, які не пройшли тест кола.
+        if valid_right_candidate:
+            next_candidate = next_edge_ccw[right_candidate]
+            next_end = start_index[next_candidate ^ 1]
+            while right_of(arena, next_end, base_start, base_end) and in_circumcircle(arena, base_end, base_start, right_end, next_end):
+                remove_edge(right_candidate)
+                right_candidate, right_end = next_candidate, next_end
+                next_candidate = next_edge_ccw[right_candidate]
+                next_end = start_index[next_candidate ^ 1]
+
+        # Аналогічно, видаляємо ребра лівого кандидата.
+        if valid_left_candidate:
+            next_candidate = prev_edge_cw[left_candidate]
+            next_end = start_index[next_candidate ^ 1]
+            while right_of(arena, next_end, base_start, base_end) and in_circumcircle(arena, base_end, base_start, left_end, next_end):
+                remove_edge(left_candidate)
+                left_candidate, left_end = next_candidate, next_end
+                next_candidate = prev_edge_cw[left_candidate]
+                next_end = start_index[next_candidate ^ 1]
+
+        # Наступне перехресне ребро має бути з'єднано або з кінцем left_candidate, або з кінцем right_candidate.
+        # right_candidate виходить з base_end, left_candidate - з base_start
+        if not valid_right_candidate or \
+                (valid_left_candidate and in_circumcircle(arena, right_end, base_end, base_start, left_end)):
+            base_edge = connect_edges(left_candidate, base_sym)
+        else:
+            base_edge = connect_edges(base_sym, right_candidate ^ 1)
+
+
+def is_point_in_circumcircle(arena, point_a, point_b, point_c, point_d):
+    """Чи лежить точка point_d всередині описаного кола навколо трикутника point_a, point_b, point_c (індекси точок).
+    Фільтр predicates.incircle вбудовано сюди, щоб не платити за виклик; сумнівні випадки рахуються точно.
+    Координати читаються з arena.point_tuples, тож виклик можливий лише всередині arena.unpacked_points()"""
+    points = arena.point_tuples
+    (ax, ay), (bx, by), (cx, cy), (dx, dy) = points[point_a], points[point_b], points[point_c], points[point_d]
+    adx, ady = ax - dx, ay - dy
+    bdx, bdy = bx - dx, by - dy
+    cdx, cdy = cx - dx, cy - dy
+
+    bdxcdy, cdxbdy = bdx * cdy, cdx * bdy
+    cdxady, adxcdy = cdx * ady, adx * cdy
+    adxbdy, bdxady = adx * bdy, bdx * ady
+    alift, blift, clift = adx * adx + ady * ady, bdx * bdx + bdy * bdy, cdx * cdx + cdy * cdy
+    determinant = alift * (bdxcdy - cdxbdy) + blift * (cdxady - adxcdy) + clift * (adxbdy - bdxady)
+    permanent = ((abs(bdxcdy) + abs(cdxbdy)) * alift +
+                 (abs(cdxady) + abs(adxcdy)) * blift +
+                 (abs(adxbdy) + abs(bdxady)) * clift)
+    if abs(determinant) > INCIRCLE_ERROR_BOUND * permanent:
+        return determinant < 0
+    return incircle_exact(ax, ay, bx, by, cx, cy, dx, dy) < 0
+
+
+def is_right_of(arena, point, start_point, end_point):
+    """Чи лежить точка point праворуч від лінії start_point -> end_point (індекси точок).
+    Фільтр predicates.orient2d вбудовано: доданки різних знаків або нуль дають |determinant| = |detleft| + |detright|,
+    тож одна перевірка оцінки похибки покриває всі випадки"""
+    points = arena.point_tuples
+    (ax, ay), (bx, by), (cx, cy) = points[start_point], points[end_point], points[point]
+    detleft = (ax - cx) * (by - cy)
+    detright = (ay - cy) * (bx - cx)
+    determinant = detleft - detright
+    if abs(determinant) >= ORIENT2D_ERROR_BOUND * abs(detleft + detright):
+        return determinant > 0
+    return orient2d_exact(ax, ay, bx, by, cx, cy) > 0
+
+
+def is_left_of(arena, point, start_point, end_point):
+    """Чи лежить точка point ліворуч від лінії start_point -> end_point"""
+    points = arena.point_tuples
+    (ax, ay), (bx, by), (cx, cy) = points[start_point], points[end_point], points[point]
+    detleft = (ax - cx) * (by - cy)
+    detright = (ay - cy) * (bx - cx)
+    determinant = detleft - detright
+    if abs(determinant) >= ORIENT2D_ERROR_BOUND * abs(detleft + detright):
+        return determinant < 0
+    return orient2d_exact(ax, ay, bx, by, cx, cy) < 0
@@ -0,0 +1,103 @@
+import multiprocessing
+import queue
+
+import numpy as np
+
+from array_delaunay_triangulation import sort_unique_points
+from dynamic_delaunay_triangulation import DynamicDelaunayTriangulation
+from parallel_delaunay_triangulation import split_strips, triangulate_strip_points, assemble_strips
+from triangulation_cache import TriangulationCache, restore_arena
+
+MAX_BLOCKING_SECONDS = 0.05  # Скільки може тривати побудова, що блокує цикл подій (кілька кадрів)
+BUILD_SECONDS_PER_POINT = 1e-4  # Оцінка часу побудови DynamicDelaunayTriangulation на одну точку
+# Запуск процесу коштує кілька мілісекунд, тож у фоні будуємо все, що займе більше MAX_BLOCKING_SECONDS
+BACKGROUND_MIN_POINTS = int(MAX_BLOCKING_SECONDS / BUILD_SECONDS_PER_POINT)
+STRIP_COUNT = 16  # На скільки смуг ділити точки, щоб показувати проміжні результати
+
+
+def triangulate_in_worker(points, results, strip_count=STRIP_COUNT, cached_edges=None):
+    """Будує DynamicDelaunayTriangulation для points (виконується в окремому процесі).
+    Якщо задано cached_edges (стиснуті масиви ребер з TriangulationCache), триангуляція відновлюється з них.
+    Інакше в чергу results спершу надсилається ('key', ключ TriangulationCache точок), щоб батьківський процес
+    міг знайти триангуляцію в кеші, потім ('strip', ребра) для кожної готової смуги дерева поділу.
+    Наприкінці - ('done', триангуляція, ребра) або ('error', опис помилки).
+    Ребра - масиви (M, 2, 2) з координатами кінців"""
+    try:
+        unique_points, _ = sort_unique_points(points)
+        count = len(unique_points)
+        arena = None
+        if cached_edges is not None:
+            arena = restore_arena(unique_points, cached_edges) if count >= 2 else None
+        else:
+            results.put(('key', TriangulationCache.key(unique_points)))
+        if arena is None and count >= 2:
+            strip_size = max(-(-count // strip_count), 3)
+            strips = split_strips(count, strip_size)
+            strip_results = []
+            for first, last in strips:
+                strip_results.append(triangulate_strip_points(unique_points[first:last]))
+                start_index = strip_results[-1][0]  # Кінці кожного ребра стоять поруч
+                results.put(('strip', unique_points[first:last][start_index.reshape(-1, 2)]))
+            arena = assemble_strips(unique_points, strips, strip_results, strip_size)
+
+        triangulation = DynamicDelaunayTriangulation(points, arena)
+        results.put(('done', triangulation, triangulation.edge_array()))
+    except Exception as error:
+        results.put(('error', repr(error)))
+
+
+class BackgroundTriangulator:
+    """Запускає побудову триангуляції в окремому процесі, щоб не блокувати цикл подій.
+    Новий запит (submit) скасовує попередній: процес застарілого запиту зупиняється,
+    а його черга результатів відкидається"""
+
+    def __init__(self, strip_count=STRIP_COUNT):
+        self.strip_count = strip_count
+        self.process = None
+        self.results = None
+
+    @property
+    def busy(self):
+        """Чи виконується зараз запит"""
+        return self.process is not None
+
+    def submit(self, points, cached_edges=None):
+        """Починає побудову триангуляції точок points, скасувавши попередній запит.
+        cached_edges - стиснуті масиви ребер з TriangulationCache, з яких процес відновить триангуляцію"""
+        self.cancel()
+        self.results = multiprocessing.Queue()
+        self.process = multiprocessing.Process(target=triangulate_in_worker, daemon=True,
+                                               args=(np.asarray(points, dtype=np.float64).reshape(-1, 2),
+                                                     self.results, self.strip_count, cached_edges))
+        self.process.start()
+
+    def cancel(self):
+        """Зупиняє поточний запит, якщо він є"""
+        if self.process is None:
+            return
+        # SIGKILL, а не SIGTERM: процес, створений через fork, успадковує обробник SIGTERM від SDL
+        self.process.kill()
+        self.finish()
+
+    def finish(self):
+        self.process.join()
+        self.results.close()
+        self.process, self.results = None, None
+
+    def poll(self):
+        """Повертає список повідомлень поточного запиту, що вже надійшли (не чекаючи на нові).
+        Після повідомлення 'done' або 'error' запит вважається завершеним"""
+        messages = []
+        while self.process is not None:
+            try:
+                message = self.results.get_nowait()
+            except queue.Empty:
+                if not self.process.is_alive() and self.results.empty():
+                    # Процес завершився, не надіславши результату (наприклад, його вбила система)
+                    messages.append(('error', "Процес триангуляції завершився з кодом {}".format(self.process.exitcode)))
+                    self.finish()
+                break
+            messages.append(message)
+            if message[0] in ('done', 'error'):
+                self.finish()
+        return messages
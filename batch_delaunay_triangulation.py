@@ -0,0 +1,350 @@
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from array_delaunay_triangulation import delaunay_triangulate
+from edge_arena import EdgeArena
+from predicates import incircle_signs, orient2d_signs
+
+# edges: (E, 2) int32 - ребра всіх наборів підряд; індекси відносяться до точок свого набору
+# offsets: (S + 1,) int64 - ребра набору i: edges[offsets[i]:offsets[i + 1]]
+PackedEdges = namedtuple('PackedEdges', ['edges', 'offsets'])
+
+SWEEP_MIN_SETS = 64  # Для меншої групи наборів дешевше триангулювати кожен набір окремо
+NEXT_SLOTS = np.array([[0, 1, 2], [1, 2, 0], [2, 0, 1]])  # Номери вершин трикутника, починаючи з i-ї
+
+
+def triangulate_many(point_sets, workers=None):
+    """Триангулює багато незалежних наборів точок (масивів (n_i, 2)) і повертає PackedEdges.
+    Сортування, видалення дублікатів і сама триангуляція виконуються одразу для всіх наборів
+    (див. SweepTriangulation), тож що більше наборів, то менша ціна одного.
+    workers > 1: набори діляться на workers частин, які обробляються в пулі процесів.
+    Спосіб триангуляції кожного набору вибирається для всього пакета до поділу (див. sweep_sets),
+    тож результат не залежить від workers"""
+    point_sets = [np.asarray(points, dtype=np.float64).reshape(-1, 2) for points in point_sets]
+    sweep = sweep_sets(np.array([len(points) for points in point_sets], dtype=np.int64))
+    if not workers or workers == 1 or len(point_sets) < 2:
+        return triangulate_sets(point_sets, sweep)
+
+    chunk_sets = -(-len(point_sets) // workers)
+    firsts = range(0, len(point_sets), chunk_sets)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(triangulate_sets, [point_sets[first:first + chunk_sets] for first in firsts],
+                                [sweep[first:first + chunk_sets] for first in firsts]))
+    return concatenate_packed(results)
+
+
+def triangulate_sets(point_sets, sweep=None):
+    """Послідовна частина triangulate_many для списку масивів (n_i, 2) float64.
+    sweep - для кожного набору, чи триангулювати його SweepTriangulation (None - як вирішить sweep_sets)"""
+    sizes = np.array([len(points) for points in point_sets], dtype=np.int64)
+    if sweep is None:
+        sweep = sweep_sets(sizes)
+    starts = np.zeros(len(point_sets) + 1, dtype=np.int64)
+    np.cumsum(sizes, out=starts[1:])
+    points = np.concatenate(point_sets) if point_sets else np.empty((0, 2))
+    set_index = np.repeat(np.arange(len(point_sets)), sizes)
+
+    # Одне сортування для всіх наборів: за номером набору, потім за x, потім за y
+    order = np.lexsort((points[:, 1], points[:, 0], set_index))
+    points, set_index = points[order], set_index[order]
+    unique = np.ones(len(points), dtype=bool)
+    unique[1:] = np.any(points[1:] != points[:-1], axis=1) | (set_index[1:] != set_index[:-1])
+    points, set_index, input_index = points[unique], set_index[unique], order[unique] - starts[set_index[unique]]
+    unique_starts = np.searchsorted(set_index, np.arange(len(point_sets) + 1))
+
+    edges = [np.empty((0, 2), dtype=np.int64)]
+    for group in size_groups(np.diff(unique_starts)):
+        edges.append(triangulate_group(points, unique_starts, group[sweep[group]], sweep=True))
+        edges.append(triangulate_group(points, unique_starts, group[~sweep[group]], sweep=False))
+    edges = np.concatenate(edges)
+    edge_set = set_index[edges[:, 0]]
+    edges = input_index[edges[np.argsort(edge_set, kind='stable')]]
+    offsets = np.zeros(len(point_sets) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(edge_set, minlength=len(point_sets)), out=offsets[1:])
+    return PackedEdges(edges.astype(np.int32), offsets)
+
+
+def size_groups(sizes):
+    """Ділить набори щонайменше з двох точок на групи, розміри в яких відрізняються менш ніж удвічі"""
+    sets = np.flatnonzero(sizes >= 2)
+    size_class = np.floor(np.log2(sizes[sets])).astype(np.int64)
+    order = np.argsort(size_class, kind='stable')
+    bounds = np.flatnonzero(np.diff(size_class[order])) + 1
+    return np.split(sets[order], bounds) if len(sets) else []
+
+
+def sweep_sets(sizes):
+    """Для наборів розмірів sizes: чи триангулювати набір SweepTriangulation. Так триангулюються набори
+    з груп (size_groups) щонайменше з SWEEP_MIN_SETS наборів; решта - кожен окремо розділяй і володарюй.
+    Для точок на одному колі ці способи можуть вибрати різні діагоналі, тому рішення залежить лише від sizes"""
+    sweep = np.zeros(len(sizes), dtype=bool)
+    for group in size_groups(sizes):
+        sweep[group] = len(group) >= SWEEP_MIN_SETS
+    return sweep
+
+
+def triangulate_group(points, starts, sets, sweep):
+    """Триангулює набори sets (точки набору i - рядки starts[i]:starts[i + 1] масиву points)
+    разом (sweep) або кожен окремо і повертає їхні ребра як індекси рядків points"""
+    if not len(sets):
+        return np.empty((0, 2), dtype=np.int64)
+    if not sweep:
+        # Одне сховище на всю групу: розміри наборів відрізняються менш ніж удвічі, тож масиви ребер
+        # найбільшого набору вистачає всім і їх не треба виділяти для кожного набору заново
+        arena = EdgeArena(np.empty((0, 2)), capacity=6 * int((starts[sets + 1] - starts[sets]).max()))
+        edges = []
+        for index in sets.tolist():
+            arena.reset(points[starts[index]:starts[index + 1]])
+            delaunay_triangulate(arena)
+            edges.append(starts[index] + arena.edge_index_pairs())
+        return np.concatenate(edges)
+    sizes = starts[sets + 1] - starts[sets]
+    local = np.arange(sizes.sum()) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+    group_set = np.repeat(np.arange(len(sets)), sizes)
+    rows = np.repeat(starts[sets], sizes) + local
+    # Точки з однаковим номером у своєму наборі стоять поруч: рядок local * len(sets) + номер набору в групі
+    interleaved = np.zeros((int(sizes.max()) * len(sets), 2))
+    interleaved[local * len(sets) + group_set] = points[rows]
+    edges = SweepTriangulation(interleaved, sizes).edges()
+    return starts[sets[edges % len(sets)]] + edges // len(sets)
+
+
+class SweepTriangulation:
+    """Триангуляція Делоне багатьох наборів точок одночасно.
+    Точки кожного набору (відсортовані за x, потім за y) додаються по одній, як в DynamicDelaunayTriangulation
+    для точки поза опуклою оболонкою: нова точка з'єднується з видимими ребрами оболонки, після чого
+    ребра навпроти неї перевіряються умовою Делоне і за потреби перевертаються.
+    Крок виконується одночасно для всіх наборів операціями numpy, тож кількість операцій Python залежить
+    від розміру найбільшого набору, а не від кількості наборів.
+    Точки та трикутники наборів чергуються: i-та точка (i-й трикутник) набору s має номер i * S + s,
+    де S - кількість наборів; так дані, потрібні на одному кроці, лежать у пам'яті поруч.
+    Трикутники зберігаються як у DelaunayArrays: вершини проти годинникової стрілки та сусіди навпроти вершин;
+    оболонка кожного набору - двозв'язний список вершин проти годинникової стрілки"""
+
+    def __init__(self, points, sizes):
+        self.points = points  # (max(sizes) * S, 2), див. вище
+        self.sizes = sizes
+        self.set_count = count = len(sizes)
+        max_size = int(sizes.max(initial=0))
+        # Трикутників у наборі менше 2 n_i
+        self.triangles = np.full((2 * max_size * count, 3), -1, dtype=np.intp)
+        self.neighbors = np.full((2 * max_size * count, 3), -1, dtype=np.intp)
+        self.triangle_count = np.zeros(count, dtype=np.int64)  # Скільки трикутників створено в кожному наборі
+        self.next_vertex = np.full(max_size * count, -1, dtype=np.int64)  # Оболонка: наступна вершина
+        self.prev_vertex = np.full(max_size * count, -1, dtype=np.int64)
+        self.hull_triangle = np.full(max_size * count, -1, dtype=np.int64)  # Трикутник при ребрі v -> next_vertex[v]
+        self.first_apex = self.start_fans()
+        for step in range(3, max_size):
+            sets = np.flatnonzero((self.first_apex < step) & (step < self.sizes))
+            if len(sets):
+                self.insert(step * count + sets, sets)
+
+    def orientation(self, a, b, c):
+        return orient2d_signs(self.points.take(a, axis=0), self.points.take(b, axis=0), self.points.take(c, axis=0))
+
+    def new_triangles(self, sets, vertices):
+        """Створює трикутники з вершинами vertices (k, 3) у наборах sets (по одному на набір)"""
+        triangles = self.triangle_count[sets] * self.set_count + sets
+        self.triangle_count[sets] += 1
+        self.triangles[triangles] = vertices
+        return triangles
+
+    def replace_neighbor(self, triangles, old, new):
+        """У трикутниках triangles (де не -1) замінює сусіда old на new"""
+        known = np.flatnonzero(triangles >= 0)
+        triangles, old, new = triangles.take(known), old.take(known), new.take(known)
+        self.neighbors.reshape(-1)[3 * triangles + slot_of(self.neighbors.take(triangles, axis=0), old)] = new
+
+    def start_fans(self):
+        """Перші точки кожного набору, що лежать на одній прямій, з'єднуються послідовно, а перша точка
+        не на цій прямій (вершина віяла) - з усіма ними. Повертає номер вершини віяла в наборі
+        (розмір набору, якщо всі точки колінеарні)"""
+        count = self.set_count
+        later = np.arange(2, max(int(self.sizes.max(initial=0)), 2))  # Номери точок у наборі, починаючи з третьої
+        vertices = (later[:, None] * count + np.arange(count)).reshape(-1)
+        exists = (later[:, None] < self.sizes).reshape(-1)
+        signs = np.zeros(len(vertices), dtype=np.int8)
+        point_set = vertices[exists] % count
+        signs[exists] = self.orientation(point_set, point_set + count, vertices[exists])
+        signs = signs.reshape(len(later), count)
+        first_apex = np.minimum(np.where(signs != 0, later[:, None], self.sizes).min(axis=0, initial=2 ** 62), self.sizes)
+
+        sets = np.flatnonzero(first_apex < self.sizes)
+        apex_local = first_apex[sets]
+        apex = apex_local * count + sets
+        is_left = signs[apex_local - 2, sets] > 0  # Вершина віяла ліворуч від прямої
+        fan_sizes = apex_local - 1
+        fan_set = np.repeat(sets, fan_sizes)
+        fan_index = np.arange(fan_sizes.sum()) - np.repeat(np.cumsum(fan_sizes) - fan_sizes, fan_sizes)
+        lower, upper = fan_index * count + fan_set, (fan_index + 1) * count + fan_set
+        left = np.repeat(is_left, fan_sizes)
+        triangles = lower  # i-й трикутник віяла спирається на i-ту та (i + 1)-шу точки
+        previous = np.where(fan_index > 0, triangles - count, -1)
+        following = np.where(fan_index < np.repeat(fan_sizes, fan_sizes) - 1, triangles + count, -1)
+        # Ліворуч: (lower, upper, apex), інакше (upper, lower, apex); навпроти apex - пряма (межа)
+        self.triangles[triangles] = np.column_stack((np.where(left, lower, upper), np.where(left, upper, lower),
+                                                     np.repeat(apex, fan_sizes)))
+        self.neighbors[triangles] = np.column_stack((np.where(left, following, previous), np.where(left, previous, following),
+                                                     np.full(len(triangles), -1)))
+        self.triangle_count[sets] = fan_sizes
+
+        # Оболонка проти годинникової стрілки: first -> ... -> apex - 1 -> apex або first -> apex -> apex - 1 -> ... -> first
+        line_start = np.where(left, lower, upper)
+        self.next_vertex[line_start] = np.where(left, upper, lower)
+        self.hull_triangle[line_start] = triangles
+        first, before_apex = sets, apex - count
+        first_triangle, last_triangle = sets, (fan_sizes - 1) * count + sets
+        self.next_vertex[apex] = np.where(is_left, first, before_apex)
+        self.hull_triangle[apex] = np.where(is_left, first_triangle, last_triangle)
+        self.next_vertex[np.where(is_left, before_apex, first)] = apex
+        self.hull_triangle[np.where(is_left, before_apex, first)] = np.where(is_left, last_triangle, first_triangle)
+        hull = np.flatnonzero(self.next_vertex >= 0)
+        self.prev_vertex[self.next_vertex[hull]] = hull
+        return first_apex
+
+    def insert(self, new_points, sets):
+        """Додає точки new_points (по одній у кожному наборі sets) праворуч від поточних триангуляцій"""
+        previous = new_points - self.set_count  # Найбільша з уже доданих точок завжди лежить на оболонці
+        stacks = Stacks(len(sets))
+        upper, first_up, last_up = self.walk(new_points, sets, previous, stacks, upward=True)
+        lower, first_down, last_down = self.walk(new_points, sets, previous, stacks, upward=False)
+        # Трикутники по обидва боки від ребра previous - new_point
+        both = (first_up >= 0) & (first_down >= 0)
+        self.neighbors[first_up[both], 0] = first_down[both]
+        self.neighbors[first_down[both], 1] = first_up[both]
+
+        self.next_vertex[lower], self.prev_vertex[new_points] = new_points, lower
+        self.next_vertex[new_points], self.prev_vertex[upper] = upper, new_points
+        self.hull_triangle[lower] = np.where(last_down >= 0, last_down, first_up)
+        self.hull_triangle[new_points] = np.where(last_up >= 0, last_up, first_down)
+        self.legalize(new_points, stacks)
+
+    def walk(self, new_points, sets, previous, stacks, upward):
+        """Обходить оболонку від previous (upward - за next_vertex, інакше за prev_vertex), доки ребра видно
+        з нових точок, і створює трикутник для кожного видимого ребра. Повертає вершини, на яких обхід зупинився,
+        та перший і останній створені трикутники кожного набору (-1, якщо їх немає)"""
+        count = len(sets)
+        first_triangle, last_triangle = np.full(count, -1), np.full(count, -1)
+        current = previous.copy()
+        rows = np.arange(count)
+        while len(rows):
+            vertex = current[rows]
+            following = (self.next_vertex if upward else self.prev_vertex)[vertex]
+            start, end = (vertex, following) if upward else (following, vertex)
+            visible = self.orientation(start, end, new_points[rows]) < 0
+            rows, start, end, vertex, following = rows[visible], start[visible], end[visible], vertex[visible], following[visible]
+            if not len(rows):
+                break
+            point = new_points[rows]
+            triangles = self.new_triangles(sets[rows], np.column_stack((end, start, point)))
+            # Навпроти point - трикутник по той бік ребра оболонки start -> end
+            inner = self.hull_triangle[start]
+            chained = last_triangle[rows]
+            neighbors = np.column_stack((chained, np.full(len(rows), -1), inner)) if upward else \
+                np.column_stack((np.full(len(rows), -1), chained, inner))
+            self.neighbors[triangles] = neighbors
+            inner_vertices = self.triangles.take(inner, axis=0)
+            self.neighbors.reshape(-1)[3 * inner + 3 - slot_of(inner_vertices, start) - slot_of(inner_vertices, end)] = triangles
+            linked = chained >= 0
+            self.neighbors[chained[linked], 1 if upward else 0] = triangles[linked]
+            first_triangle[rows] = np.where(first_triangle[rows] < 0, triangles, first_triangle[rows])
+            last_triangle[rows] = triangles
+            stacks.push(rows, triangles)
+            current[rows] = following
+        return current, first_triangle, last_triangle
+
+    def legalize(self, new_points, stacks):
+        """Перевертає ребра навпроти нових точок, що порушують умову Делоне (як _legalize
+        в DynamicDelaunayTriangulation), по одному ребру кожного набору за крок"""
+        while True:
+            rows, triangles = stacks.pop()
+            if not len(rows):
+                return
+            # Вершини трикутника, починаючи з нової точки: (point, x, y); номери відповідних комірок
+            point = new_points.take(rows)
+            cells = 3 * triangles[:, None] + NEXT_SLOTS[slot_of(self.triangles.take(triangles, axis=0), point)]
+            other = self.neighbors.reshape(-1).take(cells[:, 0])
+            inner = np.flatnonzero(other >= 0)
+            rows, triangles, cells, other, point = rows[inner], triangles[inner], cells[inner], other[inner], point[inner]
+
+            # Сусід по той бік ребра x - y, починаючи з вершини opposite: (opposite, y, x)
+            other_cells = 3 * other[:, None] + NEXT_SLOTS[slot_of(self.neighbors.take(other, axis=0), triangles)]
+            x, y = self.triangles.reshape(-1).take(cells[:, 1]), self.triangles.reshape(-1).take(cells[:, 2])
+            opposite = self.triangles.reshape(-1).take(other_cells[:, 0])
+            flip = np.flatnonzero(incircle_signs(*(self.points.take(vertex, axis=0) for vertex in (point, x, y, opposite))) > 0)
+            rows, triangles, other, point, x, y, opposite = (array.take(flip) for array in
+                                                             (rows, triangles, other, point, x, y, opposite))
+            _, across_yp, across_px = self.neighbors.reshape(-1).take(cells[flip]).T
+            _, across_xo, across_oy = self.neighbors.reshape(-1).take(other_cells[flip]).T
+
+            # Трикутники (point, x, y) та (opposite, y, x) стають (point, x, opposite) та (point, opposite, y)
+            self.triangles[triangles] = np.column_stack((point, x, opposite))
+            self.neighbors[triangles] = np.column_stack((across_xo, other, across_px))
+            self.triangles[other] = np.column_stack((point, opposite, y))
+            self.neighbors[other] = np.column_stack((across_oy, across_yp, triangles))
+            self.replace_neighbor(across_xo, other, triangles)
+            self.replace_neighbor(across_yp, triangles, other)
+            # Ребра оболонки, що перейшли до іншого трикутника
+            self.hull_triangle[x[across_xo < 0]] = triangles[across_xo < 0]
+            self.hull_triangle[opposite[across_oy < 0]] = other[across_oy < 0]
+            self.hull_triangle[y[across_yp < 0]] = other[across_yp < 0]
+            stacks.push(rows, triangles)
+            stacks.push(rows, other)
+
+    def edges(self):
+        """Ребра всіх наборів: масив (M, 2) індексів точок"""
+        created = np.flatnonzero(self.triangles[:, 0] >= 0)
+        triangles, neighbors = self.triangles[created], self.neighbors[created]
+        edges = []
+        for slot in range(3):
+            # Внутрішнє ребро належить двом трикутникам - беремо його з трикутника з меншим номером
+            once = (neighbors[:, slot] < 0) | (neighbors[:, slot] > created)
+            edges.append(np.column_stack((triangles[once, (slot + 1) % 3], triangles[once, (slot + 2) % 3])))
+
+        # Набори без трикутників: дві точки або всі точки на одній прямій
+        sets = np.flatnonzero(self.first_apex == self.sizes)
+        chain_sizes = self.sizes[sets] - 1
+        local = np.arange(chain_sizes.sum()) - np.repeat(np.cumsum(chain_sizes) - chain_sizes, chain_sizes)
+        lower = local * self.set_count + np.repeat(sets, chain_sizes)
+        edges.append(np.column_stack((lower, lower + self.set_count)))
+        return np.concatenate(edges)
+
+
+def slot_of(rows, values):
+    """Номер стовпчика, в якому рядок масиву rows (k, 3) містить відповідне значення values"""
+    return (rows[:, 1] == values) + 2 * (rows[:, 2] == values)
+
+
+class Stacks:
+    """Стеки трикутників для перевірки, по одному на кожен набір кроку (рядок)"""
+
+    def __init__(self, count):
+        self.items = np.empty((count, 8), dtype=np.int64)
+        self.heights = np.zeros(count, dtype=np.int64)
+
+    def push(self, rows, triangles):
+        if len(rows) and self.heights[rows].max() >= self.items.shape[1]:
+            self.items = np.concatenate((self.items, np.empty_like(self.items)), axis=1)
+        self.items[rows, self.heights[rows]] = triangles
+        self.heights[rows] += 1
+
+    def pop(self):
+        """Знімає по трикутнику з усіх непорожніх стеків: (рядки, трикутники)"""
+        rows = np.flatnonzero(self.heights)
+        self.heights[rows] -= 1
+        return rows, self.items[rows, self.heights[rows]]
+
+
+def concatenate_packed(results):
+    """Об'єднує кілька PackedEdges в один"""
+    edges = np.concatenate([result.edges for result in results])
+    shifts = np.cumsum([0] + [result.offsets[-1] for result in results[:-1]])
+    offsets = np.concatenate([[0]] + [result.offsets[1:] + shift for result, shift in zip(results, shifts)])
+    return PackedEdges(edges, offsets.astype(np.int64))
+
+
+def unpack_edges(packed):
+    """Список масивів ребер для кожного набору"""
+    return np.split(packed.edges, packed.offsets[1:-1])
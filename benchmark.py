@@ -0,0 +1,167 @@
+"""Бенчмарк алгоритму триангуляції без графічного інтерфейсу (pygame не імпортується).
+
+Приклад:
+    python benchmark.py --sizes 1000 10000 --output results.json
+    python benchmark.py --sizes 1000 10000 --baseline results.json
+"""
+import argparse
+import json
+import math
+import platform
+import resource
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import array_delaunay_triangulation
+import delaunay_triangulation
+import parallel_delaunay_triangulation
+from delaunay_arrays import extract_arrays
+from delaunay_verification import check_delaunay
+
+SIZES = [1000, 10000, 100000, 1000000, 10000000]
+DISTRIBUTIONS = ['uniform', 'clusters', 'grid', 'duplicates', 'collinear', 'strip', 'circle']
+ENGINES = ['objects', 'vertical', 'alternating', 'parallel']
+
+
+def generate_points(distribution, size, seed=0):
+    """Повертає масив (size, 2) точок заданого розподілу"""
+    rng = np.random.default_rng(seed)
+    if distribution == 'uniform':
+        return rng.random((size, 2)) * 10000
+    if distribution == 'clusters':  # Гаусові скупчення навколо випадкових центрів
+        centers = rng.random((max(size // 1000, 5), 2)) * 10000
+        return centers[rng.integers(0, len(centers), size)] + rng.normal(0, 50, (size, 2))
+    if distribution == 'grid':  # Ціла решітка: багато точок на одному колі
+        side = math.ceil(math.sqrt(size))
+        return np.column_stack((np.arange(size) % side, np.arange(size) // side)).astype(np.float64)
+    if distribution == 'duplicates':  # Кожна точка повторюється в середньому 10 разів
+        unique = rng.random((max(size // 10, 2), 2)) * 10000
+        return unique[rng.integers(0, len(unique), size)]
+    if distribution == 'collinear':
+        x = rng.random(size) * 10000
+        return np.column_stack((x, 2 * x + 1))
+    if distribution == 'strip':  # Довга тонка смуга
+        return np.column_stack((rng.random(size) * 10000, rng.random(size)))
+    if distribution == 'circle':  # Найгірший випадок для тесту кола
+        angles = rng.random(size) * 2 * math.pi
+        return np.column_stack((np.cos(angles), np.sin(angles))) * 10000
+    raise ValueError("Невідомий розподіл: {}".format(distribution))
+
+
+def triangulate(engine, points):
+    """Запускає рушій engine і повертає (створено ребер, залишилось ребер, EdgeArena);
+    None, якщо невідомо (рушій 'objects' не має EdgeArena)"""
+    if engine == 'objects':
+        return None, len(delaunay_triangulation.compute_delaunay_edges(points)), None
+
+    points, _ = array_delaunay_triangulation.sort_unique_points(points)
+    if engine == 'parallel':
+        arena = parallel_delaunay_triangulation.triangulate_points(points)
+    else:
+        arena = array_delaunay_triangulation.triangulate_points(points, cut_strategy=engine)
+    return arena.created_edges, len(arena.live_edges()), arena
+
+
+def run_case(engine, distribution, size, seed, trace_memory, verify=False):
+    """Один вимір; виконується в окремому процесі, щоб пікова пам'ять не змішувалась між вимірами"""
+    points = generate_points(distribution, size, seed)
+    if trace_memory:
+        tracemalloc.start()
+    start_time = time.perf_counter()
+    edges_created, edges_surviving, arena = triangulate(engine, points)
+    wall_time = time.perf_counter() - start_time
+    tracemalloc_peak = None
+    if trace_memory:
+        tracemalloc_peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        tracemalloc.stop()
+
+    certified, verify_time = None, None
+    if verify and arena is not None:
+        # Поза виміряним часом: перевірка сертифіката Делоне для отриманих ребер
+        start_time = time.perf_counter()
+        certified = check_delaunay(extract_arrays(arena)).valid
+        verify_time = time.perf_counter() - start_time
+
+    return {
+        'engine': engine,
+        'distribution': distribution,
+        'size': size,
+        'seed': seed,
+        'wall_time_s': wall_time,
+        'points_per_s': size / wall_time if wall_time else None,
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,  # ru_maxrss у КБ (Linux)
+        'tracemalloc_peak_mb': tracemalloc_peak,
+        'edges_created': edges_created,
+        'edges_surviving': edges_surviving,
+        'certified': certified,
+        'verify_time_s': verify_time,
+    }
+
+
+def compare_with_baseline(results, baseline, tolerance):
+    """Друкує відношення часу до базового запуску; повертає кількість регресій"""
+    baseline_times = {(item['engine'], item['distribution'], item['size']): item['wall_time_s'] for item in baseline['results']}
+    regressions = 0
+    for item in results:
+        baseline_time = baseline_times.get((item['engine'], item['distribution'], item['size']))
+        if baseline_time is None:
+            continue
+        ratio = item['wall_time_s'] / baseline_time
+        is_regression = ratio > 1 + tolerance
+        regressions += is_regression
+        print("{:12} {:11} {:>9} {:6.2f}x{}".format(item['engine'], item['distribution'], item['size'], ratio,
+                                                    '  РЕГРЕСІЯ' if is_regression else ''), file=sys.stderr)
+    return regressions
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description="Бенчмарк триангуляції Делоне")
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+    parser.add_argument('--distributions', nargs='+', choices=DISTRIBUTIONS, default=DISTRIBUTIONS)
+    parser.add_argument('--engines', nargs='+', choices=ENGINES, default=['vertical'])
+    parser.add_argument('--repeat', type=int, default=1, help="скільки разів повторити кожен вимір")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--tracemalloc', action='store_true', help="вимірювати пік tracemalloc (сповільнює запуск)")
+    parser.add_argument('--output', help="файл для результатів у форматі JSON (за замовчуванням stdout)")
+    parser.add_argument('--baseline', help="JSON попереднього запуску для порівняння")
+    parser.add_argument('--tolerance', type=float, default=0.1, help="допустиме сповільнення відносно baseline")
+    parser.add_argument('--verify', action='store_true', help="перевіряти, що кожен результат є триангуляцією Делоне")
+    arguments = parser.parse_args(arguments)
+
+    results = []
+    for size in arguments.sizes:
+        for distribution in arguments.distributions:
+            for engine in arguments.engines:
+                for _ in range(arguments.repeat):
+                    with ProcessPoolExecutor(max_workers=1) as pool:
+                        result = pool.submit(run_case, engine, distribution, size, arguments.seed, arguments.tracemalloc,
+                                             arguments.verify).result()
+                    print("{engine:12} {distribution:11} {size:>9} {wall_time_s:9.3f} s{}".format(
+                        '  НЕ ДЕЛОНЕ' if result['certified'] is False else '', **result), file=sys.stderr)
+                    results.append(result)
+
+    report = {
+        'meta': {'python': platform.python_version(), 'numpy': np.__version__, 'platform': platform.platform()},
+        'results': results,
+    }
+    if arguments.output:
+        with open(arguments.output, 'w') as output:
+            json.dump(report, output, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+
+    if arguments.verify and any(result['certified'] is False for result in results):
+        return 1
+    if arguments.baseline:
+        with open(arguments.baseline) as baseline:
+            if compare_with_baseline(results, json.load(baseline), arguments.tolerance):
+                return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
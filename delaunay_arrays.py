@@ -0,0 +1,105 @@
+from collections import namedtuple
+
+import numpy as np
+
+from array_delaunay_triangulation import is_integer_array, sort_unique_points, triangulate_points
+from predicates import orient2d_signs
+
+# points: (N, 2) float64 (int64 у цілому режимі) - вхідні точки у вхідному порядку
+# edges: (M, 2) int32 - неорієнтовані ребра як індекси в points
+# triangles: (K, 3) int32 - трикутники, вершини проти годинникової стрілки (вісь y напрямлена вгору)
+# neighbors: (K, 3) int32 - neighbors[k, i] - трикутник навпроти вершини triangles[k, i], -1 на ОО
+DelaunayArrays = namedtuple('DelaunayArrays', ['points', 'edges', 'triangles', 'neighbors'])
+
+
+def compute_delaunay_arrays(points, cut_strategy='vertical', integer=None):
+    """Повертає триангуляцію Делоне у вигляді масивів numpy (DelaunayArrays).
+    Індекси відносяться до вхідного масиву points; з дублікатів використовується перша точка.
+    integer=True: точні обчислення в цілих числах, points зберігаються як int64 (None - якщо points мають цілий тип)"""
+    if integer is None:
+        integer = is_integer_array(points)
+    sorted_points, input_index = sort_unique_points(points, integer)
+    points = np.asarray(points, dtype=np.int64 if integer else np.float64).reshape(-1, 2)
+    if len(sorted_points) < 2:
+        return empty_delaunay_arrays(points)
+    return extract_arrays(triangulate_points(sorted_points, cut_strategy), points, input_index)
+
+
+def empty_delaunay_arrays(points):
+    """DelaunayArrays без жодного ребра"""
+    empty = np.empty((0, 2), dtype=np.int32)
+    return DelaunayArrays(points, empty, empty.reshape(0, 3), empty.reshape(0, 3))
+
+
+def extract_arrays(arena, points=None, input_index=None):
+    """Один лінійний векторизований прохід по кільцях ребер arena.
+    input_index відображає індекси точок arena в індекси points (None - індекси не змінюються)"""
+    count = arena.edge_count
+    start_index = np.frombuffer(arena.start_index, dtype=np.intc, count=count).astype(np.int32)
+    symmetric_edge = np.frombuffer(arena.symmetric_edge, dtype=np.intc, count=count)
+    alive = np.frombuffer(arena.alive, dtype=np.uint8, count=count).astype(bool)
+    if points is None:
+        points = arena.coordinates().copy()
+
+    pair_edges = np.flatnonzero(alive[::2]) * 2
+    edges = np.column_stack((start_index[pair_edges], start_index[pair_edges + 1]))
+    first, second, third = triangle_edges(arena, np.flatnonzero(alive))
+
+    # Грані ліворуч від ребер обходять вершини за годинниковою стрілкою при осі y вгору, тому
+    # записуємо вершини у зворотному порядку: (start(first), start(third), start(second))
+    triangles = np.column_stack((start_index[first], start_index[third], start_index[second]))
+    face = np.full(count, -1, dtype=np.int32)
+    face_index = np.arange(len(first), dtype=np.int32)
+    face[first], face[second], face[third] = face_index, face_index, face_index
+    # Навпроти start(first) лежить ребро second, навпроти start(third) - first, навпроти start(second) - third
+    neighbors = np.column_stack((face[symmetric_edge[second]], face[symmetric_edge[first]], face[symmetric_edge[third]]))
+
+    if input_index is not None:
+        input_index = np.asarray(input_index, dtype=np.int32)
+        edges, triangles = input_index[edges], input_index[triangles]
+    return DelaunayArrays(points, edges.astype(np.int32), triangles.astype(np.int32), neighbors)
+
+
+def triangle_edges(arena, half_edges):
+    """Для живих ребер half_edges знаходить трикутні грані ліворуч від них.
+    Кожен трикутник повертається один раз - для ребра з найменшим індексом: масиви (first, second, third)
+    трьох ребер грані в порядку обходу"""
+    count = arena.edge_count
+    start_index = np.frombuffer(arena.start_index, dtype=np.intc, count=count)
+    symmetric_edge = np.frombuffer(arena.symmetric_edge, dtype=np.intc, count=count)
+    prev_edge_cw = np.frombuffer(arena.prev_edge_cw, dtype=np.intc, count=count)
+    coordinates = arena.coordinates()
+
+    # Наступне ребро грані ліворуч: lnext(e) = prev_edge_cw[symmetric_edge[e]]
+    second = prev_edge_cw[symmetric_edge[half_edges]]
+    third = prev_edge_cw[symmetric_edge[second]]
+
+    # Трикутна грань - це цикл з трьох ребер з потрібною орієнтацією; зовнішня грань має іншу орієнтацію
+    # або довший цикл
+    is_first = (prev_edge_cw[symmetric_edge[third]] == half_edges) & (half_edges < second) & (half_edges < third)
+    first, second, third = half_edges[is_first], second[is_first], third[is_first]
+    start_point, end_point, apex = (coordinates[start_index[edge]] for edge in (first, second, third))
+    is_triangle = orient2d_signs(start_point, end_point, apex) < 0
+    return first[is_triangle], second[is_triangle], third[is_triangle]
+
+
+def iter_edge_chunks(arena, chunk_size):
+    """Видає ребра arena частинами: масиви (m, 2) int32 індексів кінців, не більше chunk_size ребер у кожному"""
+    count = arena.edge_count
+    start_index = np.frombuffer(arena.start_index, dtype=np.intc, count=count)
+    alive = np.frombuffer(arena.alive, dtype=np.uint8, count=count)
+    for first in range(0, count, 2 * chunk_size):
+        pair_edges = first + np.flatnonzero(alive[first:first + 2 * chunk_size:2]) * 2
+        yield np.column_stack((start_index[pair_edges], start_index[pair_edges + 1])).astype(np.int32)
+
+
+def iter_triangle_chunks(arena, chunk_size):
+    """Видає трикутники arena частинами: масиви (k, 3) int32, вершини проти годинникової стрілки.
+    Частина відповідає chunk_size комірок ребер, тому містить не більше chunk_size трикутників"""
+    count = arena.edge_count
+    start_index = np.frombuffer(arena.start_index, dtype=np.intc, count=count)
+    alive = np.frombuffer(arena.alive, dtype=np.uint8, count=count)
+    for first in range(0, count, chunk_size):
+        half_edges = first + np.flatnonzero(alive[first:first + chunk_size])
+        first_edges, second_edges, third_edges = triangle_edges(arena, half_edges)
+        yield np.column_stack((start_index[first_edges], start_index[third_edges], start_index[second_edges])).astype(np.int32)
@@ -0,0 +1,136 @@
+"""Структури, що випливають з триангуляції Делоне (DelaunayArrays) без окремих обчислень над точками:
+опукла оболонка, діаграма Вороного, евклідове мінімальне кістякове дерево та найближчі сусіди.
+Усі індекси відносяться до вхідного масиву points"""
+from collections import namedtuple
+
+import numpy as np
+
+# vertices: (K, 2) float64 - вершини Вороного, центри описаних кіл трикутників (рядок k - трикутник k)
+# ridge_points: (M, 2) int32 - ребро Делоне, яке перетинає кожне ребро Вороного
+# ridge_vertices: (M, 2) int32 - вершини ребра Вороного; -1 - нескінченний кінець
+# directions: (M, 2) float64 - напрямок променя від ridge_vertices[m, 0], якщо ridge_vertices[m, 1] == -1
+#   (для колінеарних точок обидва кінці -1, а ребро - пряма з цим напрямком)
+VoronoiDiagram = namedtuple('VoronoiDiagram', ['vertices', 'ridge_points', 'ridge_vertices', 'directions'])
+
+
+def boundary_edges(delaunay):
+    """Ребра трикутників без сусіда: масив (H, 2), напрямлені проти годинникової стрілки вздовж оболонки"""
+    triangle, slot = np.nonzero(delaunay.neighbors < 0)
+    return np.column_stack((delaunay.triangles[triangle, (slot + 1) % 3], delaunay.triangles[triangle, (slot + 2) % 3]))
+
+
+def convex_hull(delaunay):
+    """Вершини опуклої оболонки проти годинникової стрілки, починаючи з найлівішої (найнижчої з них).
+    Точки, що лежать на сторонах оболонки, теж входять. Якщо всі точки колінеарні - два крайні індекси"""
+    points = delaunay.points
+    if not len(delaunay.triangles):
+        if not len(delaunay.edges):
+            return np.arange(min(len(points), 1), dtype=np.int32)
+        # Ланцюжок ребер на прямій: кінці - вершини степеня 1
+        degree = np.bincount(delaunay.edges.reshape(-1), minlength=len(points))
+        ends = np.flatnonzero(degree == 1)
+        return ends[np.lexsort((points[ends, 1], points[ends, 0]))].astype(np.int32)
+
+    edges = boundary_edges(delaunay)
+    next_vertex = np.full(len(points), -1, dtype=np.int64)
+    next_vertex[edges[:, 0]] = edges[:, 1]
+    first = edges[np.lexsort((points[edges[:, 0], 1], points[edges[:, 0], 0]))[0], 0]
+    hull = [first]
+    vertex = next_vertex[first]
+    while vertex != first:
+        hull.append(vertex)
+        vertex = next_vertex[vertex]
+    return np.array(hull, dtype=np.int32)
+
+
+def circumcenters(delaunay):
+    """Центри описаних кіл усіх трикутників: масив (K, 2)"""
+    a, b, c = (delaunay.points[delaunay.triangles[:, i]] for i in range(3))
+    # Відносно вершини a, щоб зменшити похибку
+    b, c = b - a, c - a
+    b_lift, c_lift = (b ** 2).sum(axis=1), (c ** 2).sum(axis=1)
+    denominator = 2 * (b[:, 0] * c[:, 1] - b[:, 1] * c[:, 0])
+    x = (c[:, 1] * b_lift - b[:, 1] * c_lift) / denominator
+    y = (b[:, 0] * c_lift - c[:, 0] * b_lift) / denominator
+    return a + np.column_stack((x, y))
+
+
+def voronoi_diagram(delaunay):
+    """Діаграма Вороного, двоїста до триангуляції (VoronoiDiagram).
+    Кожному внутрішньому ребру Делоне відповідає відрізок між центрами кіл двох сусідніх трикутників,
+    ребру оболонки - промінь назовні, перпендикулярний до нього"""
+    points = delaunay.points
+    if not len(delaunay.triangles):
+        ridge_points = delaunay.edges
+        ridge_vertices = np.full((len(ridge_points), 2), -1, dtype=np.int32)
+        tangent = points[ridge_points[:, 1]] - points[ridge_points[:, 0]]
+        directions = np.column_stack((tangent[:, 1], -tangent[:, 0]))
+        return VoronoiDiagram(np.empty((0, 2)), ridge_points, ridge_vertices, directions)
+
+    triangle, slot = np.nonzero((delaunay.neighbors < 0) | (delaunay.neighbors > np.arange(len(delaunay.triangles))[:, None]))
+    neighbor = delaunay.neighbors[triangle, slot]
+    ridge_points = np.column_stack((delaunay.triangles[triangle, (slot + 1) % 3], delaunay.triangles[triangle, (slot + 2) % 3]))
+    ridge_vertices = np.column_stack((triangle, neighbor)).astype(np.int32)
+    # Ребро оболонки напрямлене проти годинникової стрілки, тож зовнішня нормаль дивиться праворуч від нього
+    tangent = points[ridge_points[:, 1]] - points[ridge_points[:, 0]]
+    directions = np.where((neighbor < 0)[:, None], np.column_stack((tangent[:, 1], -tangent[:, 0])), 0.0)
+    return VoronoiDiagram(circumcenters(delaunay), ridge_points, ridge_vertices, directions)
+
+
+def minimum_spanning_tree(delaunay):
+    """Евклідове мінімальне кістякове дерево: масив (V - 1, 2) ребер, де V - кількість різних точок.
+    Дерево міститься в триангуляції Делоне, тож алгоритм Крускала перебирає лише її ребра"""
+    edges, points = delaunay.edges, delaunay.points
+    lengths = ((points[edges[:, 0]] - points[edges[:, 1]]) ** 2).sum(axis=1)
+    parent = list(range(len(points)))
+    tree = []
+    tree_size = np.count_nonzero(np.bincount(edges.reshape(-1), minlength=len(points))) - 1
+    for start, end in edges[np.argsort(lengths, kind='stable')].tolist():
+        # Корені компонент кінців, зі скороченням шляху навпіл
+        start_root, end_root = start, end
+        while parent[start_root] != start_root:
+            parent[start_root] = start_root = parent[parent[start_root]]
+        while parent[end_root] != end_root:
+            parent[end_root] = end_root = parent[parent[end_root]]
+        if start_root != end_root:
+            parent[start_root] = end_root
+            tree.append((start, end))
+            if len(tree) == tree_size:
+                break
+    return np.array(tree, dtype=np.int32).reshape(-1, 2)
+
+
+def nearest_neighbors(delaunay):
+    """Найближча інша точка для кожної точки: масиви (N,) індексів і (N,) відстаней.
+    Найближчий сусід завжди з'єднаний з точкою ребром Делоне; дублікати (не увійшли до триангуляції)
+    мають відстань 0 до своєї копії. Для єдиної точки - індекс -1 і відстань inf"""
+    edges, points = delaunay.edges, delaunay.points
+    count = len(points)
+    start, end = np.concatenate((edges[:, 0], edges[:, 1])), np.concatenate((edges[:, 1], edges[:, 0]))
+    lengths = ((points[start] - points[end]) ** 2).sum(axis=1)
+    # Ребра, згруповані за початковою вершиною; у кожній групі береться перше з найкоротших
+    order = np.argsort(start, kind='stable')
+    start, end, lengths = start[order], end[order], lengths[order]
+    group_start = np.flatnonzero(np.r_[True, start[1:] != start[:-1]]) if len(start) else np.empty(0, dtype=np.int64)
+    shortest = np.minimum.reduceat(lengths, group_start) if len(start) else lengths
+    candidates = np.flatnonzero(lengths == np.repeat(shortest, np.diff(np.r_[group_start, len(start)])))
+    first = candidates[np.r_[True, start[candidates[1:]] != start[candidates[:-1]]]] if len(candidates) else candidates
+
+    nearest = np.full(count, -1, dtype=np.int32)
+    distances = np.full(count, np.inf)
+    nearest[start[first]] = end[first]
+    distances[start[first]] = np.sqrt(lengths[first])
+
+    if len(first) < count and count >= 2:
+        # Є дублікати: групуємо однакові точки одним сортуванням
+        order = np.lexsort((points[:, 1], points[:, 0]))
+        same = np.all(points[order][1:] == points[order][:-1], axis=1)
+        group_start = np.flatnonzero(np.r_[True, ~same])
+        group_first = np.repeat(order[group_start], np.diff(np.r_[group_start, count]))
+        group_second = np.repeat(order[np.minimum(group_start + 1, count - 1)], np.diff(np.r_[group_start, count]))
+        duplicated = np.r_[same, False] | np.r_[False, same]
+        members = order[duplicated]
+        firsts = group_first[duplicated]
+        nearest[members] = np.where(members == firsts, group_second[duplicated], firsts)
+        distances[members] = 0.0
+    return nearest, distances
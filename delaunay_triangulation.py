@@ -1,6 +1,6 @@
-import numpy as np
-
 from edge import Edge
+from array_delaunay_triangulation import sort_unique_points
+from predicates import orient2d, incircle
 
 edges_list = []
 
@@ -13,15 +13,9 @@ def compute_delaunay_edges(points):
 
     global edges_list
     edges_list = []  # Ініціалізація порожнього списку для зберігання ребер
-    points = np.asarray(points, dtype=np.float64)  # Перетворення списку точок у масив numpy з типом даних float64
-
-    # Сортуємо точки за координатою x, координата y є вирішувачем при рівних x
-    points.view(dtype=[('f0', points.dtype), ('f1', points.dtype)]).sort(order=['f0', 'f1'], axis=0)
-
-    # Видаляємо дублікати
-    duplicate_indices = [i for i in range(1, len(points)) if points[i - 1][0] == points[i][0] and points[i - 1][1] == points[i][1]]
-    if duplicate_indices:
-        points = np.delete(points, duplicate_indices, 0)  # Видалення дублікатів точок
+    # Сортуємо точки за координатою x (координата y є вирішувачем при рівних x) і видаляємо дублікати
+    points, _ = sort_unique_points(points)
+    points = list(map(tuple, points.tolist()))  # Предикати працюють зі звичайними float, а не зі скалярами numpy
 
     delaunay_triangulate(points)  # Виклик функції для виконання триангуляції Делоне
     edges_list = [edge for edge in edges_list if edge.to_be_deleted is None]  # Очищення сміття, видалення зайвих ребер
@@ -135,38 +129,18 @@ def merge(leftmost_delaunay_edge, rightmost_delaunay_edge, base_edge):
 
 def is_point_in_circumcircle(point_a, point_b, point_c, point_d):
     """Чи лежить point_d всередині описаного кола навколо трикутника, утвореного точками point_a, point_b, point_c"""
-    # Обчислюємо відстані між точкою point_d та точками point_a, point_b, point_c
-    distance_a1, distance_a2 = point_a[0] - point_d[0], point_a[1] - point_d[1]
-    distance_b1, distance_b2 = point_b[0] - point_d[0], point_b[1] - point_d[1]
-    distance_c1, distance_c2 = point_c[0] - point_d[0], point_c[1] - point_d[1]
-    # Обчислюємо квадрати відстаней
-    squared_distance_a = distance_a1 ** 2 + distance_a2 ** 2
-    squared_distance_b = distance_b1 ** 2 + distance_b2 ** 2
-    squared_distance_c = distance_c1 ** 2 + distance_c2 ** 2
-    # Обчислюємо визначник
-    determinant = (distance_a1 * distance_b2 * squared_distance_c +
-                   distance_a2 * squared_distance_b * distance_c1 +
-                   squared_distance_a * distance_b1 * distance_c2 -
-                   (squared_distance_a * distance_b2 * distance_c1 +
-                    distance_a1 * squared_distance_b * distance_c2 +
-                    distance_a2 * distance_b1 * squared_distance_c))
-    return determinant < 0  # Повертаємо True, якщо точка point_d лежить всередині кола
+    return incircle(*point_a, *point_b, *point_c, *point_d) < 0  # Повертаємо True, якщо точка point_d лежить всередині кола
 
 
 def is_right_of(point, edge):
     """Чи лежить точка point праворуч від лінії, утвореної ребром edge"""
-    start_point, end_point = edge.start_point, edge.end_point  # Початкова і кінцева точки ребра edge
-    # Обчислюємо визначник для перевірки розташування точки point відносно лінії
-    determinant = (start_point[0] - point[0]) * (end_point[1] - point[1]) - (start_point[1] - point[1]) * (end_point[0] - point[0])
-    return determinant > 0  # Повертаємо True, якщо точка point праворуч від лінії
+    # Визначник (start_point - point) x (end_point - point) зі знаком, обчисленим надійно
+    return orient2d(*edge.start_point, *edge.end_point, *point) > 0  # Повертаємо True, якщо точка point праворуч від лінії
 
 
 def is_left_of(point, edge):
     """Чи лежить точка point ліворуч від лінії, утвореної ребром edge"""
-    start_point, end_point = edge.start_point, edge.end_point  # Початкова і кінцева точки ребра edge
-    # Обчислюємо визначник для перевірки розташування точки point відносно лінії
-    determinant = (start_point[0] - point[0]) * (end_point[1] - point[1]) - (start_point[1] - point[1]) * (end_point[0] - point[0])
-    return determinant < 0  # Повертаємо True, якщо точка point ліворуч від лінії
+    return orient2d(*edge.start_point, *edge.end_point, *point) < 0  # Повертаємо True, якщо точка point ліворуч від лінії
 
 
 def create_new_edge(start_point, end_point):
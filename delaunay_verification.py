@@ -0,0 +1,136 @@
+"""Перевірка сертифіката Делоне для DelaunayArrays пакетними операціями numpy, без циклів Python по ребрах.
+Якщо трикутники орієнтовані проти годинникової стрілки, сусідство взаємне, кожне внутрішнє ребро локально
+Делоне, межа - одна опукла ламана, а V - E + F = 1, то триангуляція покриває опуклу оболонку всіх точок
+і є триангуляцією Делоне. Окремо перевіряється, що список ребер - це саме сторони трикутників"""
+from collections import namedtuple
+
+import numpy as np
+
+from array_delaunay_triangulation import is_integer_array, sort_unique_points
+from predicates import orient2d_signs, incircle_signs
+
+# valid: чи пройдено всі перевірки
+# non_delaunay_edges: (P, 2) int32 - внутрішні ребра, протилежна вершина яких лежить строго в описаному колі
+# inverted_triangles: (T,) int32 - трикутники, що не орієнтовані проти годинникової стрілки (або вироджені)
+# mismatched_neighbors: (Q, 2) int32 - пари (трикутник, позиція), для яких сусідство не взаємне
+# mismatched_edges: (D, 2) int32 - ребра (менший індекс першим), що є лише серед edges або лише серед сторін
+#     трикутників, а також ребра, записані в edges кілька разів
+# reflex_hull_vertices: (R,) int32 - вершини межі, де вона повертає за годинниковою стрілкою або розривається
+# euler_characteristic: V - E + F для різних точок, ребер і трикутників (має бути 1)
+DelaunayCertificate = namedtuple('DelaunayCertificate', ['valid', 'non_delaunay_edges', 'inverted_triangles',
+                                                         'mismatched_neighbors', 'mismatched_edges',
+                                                         'reflex_hull_vertices', 'euler_characteristic'])
+
+
+def check_delaunay(delaunay):
+    """Перевіряє триангуляцію delaunay (DelaunayArrays) і повертає DelaunayCertificate з усіма порушеннями"""
+    points = exact_points(delaunay.points)
+    triangles, neighbors = delaunay.triangles, delaunay.neighbors
+    unique_count = len(sort_unique_points(points, is_integer_array(points))[0])
+    euler_characteristic = unique_count - len(delaunay.edges) + len(triangles)
+    empty = np.empty(0, dtype=np.int32)
+
+    if not len(triangles):
+        # Без трикутників точки мають лежати на одній прямій, а ребра - з'єднувати сусідні з них
+        reflex_hull_vertices = collinear_chain_errors(points, delaunay.edges)
+        valid = euler_characteristic == 1 and not len(reflex_hull_vertices)
+        return DelaunayCertificate(bool(valid), empty.reshape(0, 2), empty, empty.reshape(0, 2), empty.reshape(0, 2),
+                                   reflex_hull_vertices, euler_characteristic)
+
+    a, b, c = (points[triangles[:, i]] for i in range(3))
+    inverted_triangles = np.flatnonzero(orient2d_signs(a, b, c) <= 0).astype(np.int32)
+
+    # Для кожної пари (k, i) з сусідом m знаходимо позицію j трикутника k серед сусідів m
+    triangle, slot = np.nonzero(neighbors >= 0)
+    neighbor = neighbors[triangle, slot]
+    back = neighbors[neighbor] == triangle[:, None]
+    neighbor_slot = np.argmax(back, axis=1)
+    # Спільне ребро має ті самі вершини в протилежному напрямку
+    matched = (back.any(axis=1) &
+               (triangles[neighbor, (neighbor_slot + 1) % 3] == triangles[triangle, (slot + 2) % 3]) &
+               (triangles[neighbor, (neighbor_slot + 2) % 3] == triangles[triangle, (slot + 1) % 3]))
+    mismatched_neighbors = np.column_stack((triangle[~matched], slot[~matched])).astype(np.int32)
+
+    # Локальна умова Делоне: кожне внутрішнє ребро перевіряємо один раз (з боку трикутника з меншим індексом)
+    once = matched & (triangle < neighbor)
+    triangle, slot, neighbor, neighbor_slot = triangle[once], slot[once], neighbor[once], neighbor_slot[once]
+    opposite = points[triangles[neighbor, neighbor_slot]]
+    inside = incircle_signs(a[triangle], b[triangle], c[triangle], opposite) > 0
+    non_delaunay_edges = np.column_stack((triangles[triangle[inside], (slot[inside] + 1) % 3],
+                                          triangles[triangle[inside], (slot[inside] + 2) % 3])).astype(np.int32)
+
+    reflex_hull_vertices = hull_errors(points, triangles, neighbors)
+    mismatched_edges = edge_errors(delaunay.edges, triangles)
+    valid = (euler_characteristic == 1 and not len(mismatched_edges) and not len(non_delaunay_edges) and
+             not len(inverted_triangles) and not len(mismatched_neighbors) and not len(reflex_hull_vertices))
+    return DelaunayCertificate(bool(valid), non_delaunay_edges, inverted_triangles, mismatched_neighbors,
+                               mismatched_edges, reflex_hull_vertices, euler_characteristic)
+
+
+def exact_points(points):
+    """Дійсні координати, що всі є цілими числами (наприклад, решітка), перетворює на int64,
+    щоб предикати рахували їх точно одразу, без повільного уточнення для кожного рядка з нульовим знаком"""
+    points = np.asarray(points)
+    if is_integer_array(points) or not len(points):
+        return points
+    if np.abs(points).max() < 2 ** 62 and np.array_equal(points, np.round(points)):
+        return points.astype(np.int64)
+    return points
+
+
+def edge_errors(edges, triangles):
+    """Ребра, у яких не збігаються edges і сторони трикутників: кожне ребро edges має бути записане
+    рівно один раз і бути стороною трикутника, а кожна сторона трикутника - бути серед edges"""
+    sides = triangles[:, [1, 2, 0, 2, 0, 1]].reshape(-1, 2)  # Сторони навпроти кожної вершини
+    combined = np.sort(np.concatenate((sides, edges)).astype(np.int64), axis=1)
+    # Ребро (a, b), a < b, і те, чи воно з edges, кодуємо одним числом, тож однакові ребра після сортування стоять поруч
+    vertex_count = int(combined.max(initial=0)) + 1
+    keys = (combined[:, 0] * vertex_count + combined[:, 1]) * 2
+    keys[len(sides):] += 1
+    keys.sort()
+    edge_keys, is_listed = keys >> 1, keys & 1
+    first = np.flatnonzero(np.r_[True, edge_keys[1:] != edge_keys[:-1]]) if len(keys) else np.empty(0, dtype=np.int64)
+    listed_count = np.add.reduceat(is_listed, first) if len(first) else np.empty(0, dtype=np.int64)
+    side_count = np.diff(np.r_[first, len(keys)]) - listed_count
+    mismatched = edge_keys[first[(listed_count != 1) | (side_count == 0)]]
+    return np.column_stack((mismatched // vertex_count, mismatched % vertex_count)).astype(np.int32)
+
+
+def hull_errors(points, triangles, neighbors):
+    """Вершини межі, у яких вона не є частиною однієї опуклої ламаної проти годинникової стрілки"""
+    triangle, slot = np.nonzero(neighbors < 0)
+    start, end = triangles[triangle, (slot + 1) % 3], triangles[triangle, (slot + 2) % 3]
+    # З кожної вершини межі виходить і входить рівно одне ребро межі
+    out_degree = np.bincount(start, minlength=len(points))
+    in_degree = np.bincount(end, minlength=len(points))
+    next_vertex = np.full(len(points), -1, dtype=np.int64)
+    next_vertex[start] = end
+    following = next_vertex[end]
+    broken = (out_degree[end] != 1) | (in_degree[end] != 1) | (following < 0)
+    following = np.where(broken, start, following)
+
+    # Межа повертає лише ліворуч (точки на сторонах оболонки допускаються)
+    reflex = broken | (orient2d_signs(points[start], points[end], points[following]) < 0)
+    if not reflex.any():
+        # Опукла замкнена ламана обходить усе коло рівно один раз; кілька окремих циклів дали б кілька обертів
+        incoming = (points[end] - points[start]).astype(np.float64)
+        outgoing = (points[following] - points[end]).astype(np.float64)
+        turns = np.arctan2(incoming[:, 0] * outgoing[:, 1] - incoming[:, 1] * outgoing[:, 0],
+                           (incoming * outgoing).sum(axis=1)).sum() / (2 * np.pi)
+        if round(turns) != 1:
+            reflex[:] = True
+    return np.unique(end[reflex]).astype(np.int32)
+
+
+def collinear_chain_errors(points, edges):
+    """Для триангуляції без трикутників: вершини, через які точки не лежать на одній прямій
+    або ребра не з'єднують сусідні точки на ній"""
+    order = np.lexsort((points[:, 1], points[:, 0]))
+    first, last = points[order[0]], points[order[-1]]
+    off_line = orient2d_signs(np.broadcast_to(first, points.shape), np.broadcast_to(last, points.shape), points) != 0
+    # Номер кожної точки серед різних точок уздовж прямої (дублікати мають той самий номер)
+    sorted_points = points[order]
+    rank = np.empty(len(points), dtype=np.int64)
+    rank[order] = np.cumsum(np.r_[False, np.any(sorted_points[1:] != sorted_points[:-1], axis=1)])
+    far_edges = np.abs(rank[edges[:, 0]] - rank[edges[:, 1]]) != 1
+    return np.unique(np.concatenate((np.flatnonzero(off_line), edges[far_edges].reshape(-1)))).astype(np.int32)
@@ -0,0 +1,380 @@
+from array import array
+
+import numpy as np
+
+from edge import Edge
+from edge_arena import EdgeArena
+from array_delaunay_triangulation import sort_unique_points, triangulate_points
+from point_grid import PointGrid
+from predicates import orient2d, incircle
+
+
+class DynamicDelaunayTriangulation:
+    """Триангуляція Делоне, що зберігає структуру ребер між викликами та оновлюється локально.
+    insert(point): локалізація точки (стрибок до найближчої вершини та обхід трикутників)
+    і перевертання ребер (Lawson).
+    delete(point): перевертання ребер навколо вершини до мінімального степеня, видалення вершини
+    та відновлення умови Делоне в утвореній дірці. Якщо жодне ребро перевернути не можна (сусіди на одній
+    прямій або одному колі, як на решітці), дірка триангулюється відрізанням вух, а потім перевертаннями Lawson.
+    Повторні точки враховуються лічильником і не змінюють структуру ребер"""
+
+    def __init__(self, points=(), arena=None):
+        """arena: готова триангуляція відсортованих унікальних точок points (якщо вже обчислена)"""
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        unique_points, _ = sort_unique_points(points)
+        self.duplicates = {}  # Кількість додаткових копій точки (x, y)
+        if len(unique_points) != len(points):
+            for key in map(tuple, points.tolist()):
+                self.duplicates[key] = self.duplicates.get(key, -1) + 1
+            self.duplicates = {key: count for key, count in self.duplicates.items() if count}
+        self._build(unique_points, arena)
+
+    def __len__(self):
+        """Кількість різних точок у триангуляції"""
+        return len(self.point_index)
+
+    def __contains__(self, point):
+        return (float(point[0]), float(point[1])) in self.point_index
+
+    def _build(self, points, arena=None):
+        """Будує триангуляцію заново методом «розділяй і володарюй» для відсортованих унікальних точок"""
+        self.build_count = getattr(self, 'build_count', 0) + 1  # Скільки разів триангуляцію будували заново
+        if arena is None:
+            arena = triangulate_points(points) if len(points) >= 2 else EdgeArena(points)
+        self.arena = arena
+        self.point_index = {key: index for index, key in enumerate(map(tuple, points.tolist()))}
+        self.vertex_grid = PointGrid(points)  # Сітка для пошуку найближчої вершини (ідентифікатор - індекс точки)
+        self.free_points = []  # Індекси видалених точок, які можна використати повторно
+
+        # Для кожної точки зберігаємо одне ребро, що з нею починається
+        vertex_edge = np.full(len(points), -1, dtype=np.intc)
+        edges = self.arena.live_edges()
+        start_index = np.frombuffer(self.arena.start_index, dtype=np.intc, count=self.arena.edge_count)
+        vertex_edge[start_index[edges]], vertex_edge[start_index[edges + 1]] = edges, edges + 1
+        del start_index
+        self.vertex_edge = array('i', vertex_edge.tobytes())
+        self.last_edge = int(edges[0]) if len(edges) else -1  # Звідси починається пошук точки
+
+        # Поки немає жодного трикутника, локальні оновлення неможливі
+        self.degenerate = True
+        if len(points) >= 3:
+            direction, offsets = points[-1] - points[0], points - points[0]
+            self.degenerate = not np.any(direction[0] * offsets[:, 1] - direction[1] * offsets[:, 0])
+
+    def _rebuild(self, extra_points=()):
+        """Будує триангуляцію заново з поточних точок і точок extra_points"""
+        points = list(self.point_index) + list(extra_points)
+        self._build(sort_unique_points(np.array(points, dtype=np.float64).reshape(-1, 2))[0])
+
+    def insert(self, point):
+        """Додає точку в триангуляцію; повертає False, якщо така точка вже була"""
+        key = (float(point[0]), float(point[1]))
+        if key in self.point_index:
+            self.duplicates[key] = self.duplicates.get(key, 0) + 1
+            return False
+        if self.degenerate:
+            self._rebuild([key])
+            return True
+
+        edge, inside = self.locate(key)
+        vertex = self._add_vertex(key)
+        if not inside:
+            self._insert_outside(vertex, edge)
+            return True
+
+        face = self._face_edges(edge)
+        on_edge = [face_edge for face_edge in face if self._orientation(key, face_edge) == 0]
+        if on_edge:
+            edge = on_edge[0]
+            if not self._is_triangle(self.arena.symmetric_edge[edge]):
+                # Точка лежить на ребрі ОО: після його видалення вона опиняється ззовні ОО
+                outer_edge = self._lnext(edge)
+                self._remove_edge(edge)
+                self._insert_outside(vertex, outer_edge)
+                return True
+            edge = self.arena.prev_edge_cw[edge]
+            self._remove_edge(self.arena.next_edge_ccw[edge])
+            face = self._face_edges(edge)  # Тепер точка всередині чотирикутника
+
+        self._connect_vertex(vertex, face[:-1])
+        self._legalize(face)
+        return True
+
+    def delete(self, point):
+        """Видаляє точку з триангуляції; повертає False, якщо такої точки немає"""
+        key = (float(point[0]), float(point[1]))
+        vertex = self.point_index.get(key)
+        if vertex is None:
+            return False
+        if key in self.duplicates:
+            self.duplicates[key] -= 1
+            if not self.duplicates[key]:
+                del self.duplicates[key]
+            return True
+
+        del self.point_index[key]
+        self.vertex_grid.remove(key, vertex)
+        if self.degenerate or len(self._vertex_ring(vertex)) >= len(self.point_index):
+            # Без цієї точки решта може виявитися колінеарною, тому будуємо заново
+            self._rebuild()
+            return True
+
+        symmetric_edge = self.arena.symmetric_edge
+        ring = self._vertex_ring(vertex)
+        is_hull_vertex = not all(self._is_triangle(edge) for edge in ring)
+        suspect_edges = []
+        while is_hull_vertex or len(ring) > 3:
+            flippable = [edge for edge in ring if self._is_flippable(edge)]
+            if not flippable and is_hull_vertex:
+                # Вершина лежить на відрізку ОО між сусідами: нове ребро ОО проходить через неї
+                flippable = [edge for edge in ring if self._is_flippable(edge, allow_collinear=True)]
+            if not flippable:
+                break
+            self._swap(flippable[0])  # Ребро перестає виходити з vertex
+            suspect_edges.append(flippable[0])
+            ring = self._vertex_ring(vertex)
+        suspect_edges += [self._lnext(edge) for edge in ring if self._is_triangle(edge)]
+        for edge in ring:
+            self._remove_edge(edge)
+        if not is_hull_vertex and len(ring) > 3:
+            # Залишилась многокутна дірка: ребра її межі - останні в suspect_edges
+            suspect_edges += self._fill_hole(suspect_edges[-1])
+        self.free_points.append(vertex)
+        self.last_edge = symmetric_edge[suspect_edges[-1]]
+        self._legalize(suspect_edges)
+        return True
+
+    def nearest(self, point, max_distance=float('inf')):
+        """Повертає координати найближчої до point вершини (не далі max_distance) або None"""
+        nearest = self.vertex_grid.nearest(point, max_distance)
+        return nearest[:2] if nearest is not None else None
+
+    def find_triangle(self, point):
+        """Повертає координати вершин трикутника, що містить точку point (або None, якщо точка поза ОО)"""
+        if self.degenerate:
+            return None
+        edge, inside = self.locate(point)
+        if not inside:
+            return None
+        return tuple(self.arena.point(self.arena.start_index[face_edge]) for face_edge in self._face_edges(edge))
+
+    def locate(self, point):
+        """Шукає точку point: стрибок до найближчої вершини за допомогою vertex_grid,
+        а від неї обхід трикутників у напрямку точки.
+        Повертає (edge, True), якщо точка лежить у трикутнику ліворуч від ребра edge (або на його межі),
+        і (edge, False), якщо точка лежить поза ОО і ребро ОО edge видно з неї"""
+        symmetric_edge = self.arena.symmetric_edge
+        nearest = self.vertex_grid.nearest(point)
+        edge = self.vertex_edge[nearest[2]] if nearest is not None else self.last_edge
+        if edge < 0 or not self.arena.alive[edge]:
+            edge = int(self.arena.live_edges()[0])
+        if not self._is_triangle(edge):
+            edge = symmetric_edge[edge]
+
+        while True:
+            next_edge = self._lnext(edge)
+            for face_edge in (next_edge, self._lnext(next_edge), edge):
+                if self._orientation(point, face_edge) > 0:  # Точка по інший бік ребра
+                    edge = symmetric_edge[face_edge]
+                    if not self._is_triangle(edge):
+                        return edge, False
+                    break
+            else:
+                self.last_edge = edge
+                return edge, True
+
+    def compute_edges(self):
+        """Повертає список ребер триангуляції у форматі compute_delaunay_edges"""
+        points = np.array(self.arena.points, dtype=np.float64).reshape(-1, 2)
+        return [Edge(points[start], points[end]) for start, end in self.arena.edge_index_pairs()]
+
+    def edge_array(self):
+        """Повертає масив (M, 2, 2) з координатами кінців кожного ребра"""
+        points = self.arena.coordinates()
+        edges = points[self.arena.edge_index_pairs()]
+        del points  # Звільняємо буфер arena.points
+        return edges
+
+    def neighbors(self, point):
+        """Повертає список координат вершин, з'єднаних ребром з точкою point"""
+        vertex = self.point_index.get((float(point[0]), float(point[1])))
+        if vertex is None or self.vertex_edge[vertex] < 0:
+            return []
+        return [self.arena.point(self.arena.end_index(edge)) for edge in self._vertex_ring(vertex)]
+
+    def _add_vertex(self, key):
+        """Записує координати нової точки і повертає її індекс"""
+        if self.free_points:
+            vertex = self.free_points.pop()
+            self.arena.points[2 * vertex], self.arena.points[2 * vertex + 1] = key
+        else:
+            vertex = self.arena.add_point(*key)
+            self.vertex_edge.append(-1)
+        self.point_index[key] = vertex
+        self.vertex_grid.add(key, vertex)
+        return vertex
+
+    def _insert_outside(self, vertex, edge):
+        """З'єднує точку поза ОО з усіма видимими з неї ребрами ОО, починаючи з ребра edge"""
+        key = self.arena.point(vertex)
+        chain = [edge]
+        previous_edge = self._lprev(edge)
+        while self._orientation(key, previous_edge) < 0:
+            chain.insert(0, previous_edge)
+            previous_edge = self._lprev(previous_edge)
+        next_edge = self._lnext(edge)
+        while self._orientation(key, next_edge) < 0:
+            chain.append(next_edge)
+            next_edge = self._lnext(next_edge)
+
+        self._connect_vertex(vertex, chain)
+        self._legalize(chain)
+
+    def _connect_vertex(self, vertex, chain):
+        """З'єднує вершину vertex з початком chain[0] і кінцем кожного ребра ланцюжка chain.
+        Вершина лежить у грані ліворуч від ребер ланцюжка"""
+        arena = self.arena
+        base_edge = arena.create_new_edge(arena.start_index[chain[0]], vertex)
+        arena.splice_edges(base_edge, chain[0])
+        self.vertex_edge[vertex] = arena.symmetric_edge[base_edge]
+        for edge in chain:
+            base_edge = arena.connect_edges(edge, arena.symmetric_edge[base_edge])
+        self.last_edge = base_edge
+
+    def _fill_hole(self, edge):
+        """Триангулює многокутну грань ліворуч від ребра edge, відрізаючи вуха; повертає нові ребра.
+        Вухо - опукла вершина, трикутник якої (разом з межею) не містить інших вершин многокутника"""
+        arena = self.arena
+        face = self._face_edges(edge)
+        corners = [arena.start_index[face_edge] for face_edge in face]  # corners[i] - початок face[i]
+        new_edges = []
+        while len(face) > 3:
+            for position in range(len(face)):
+                if self._is_ear(corners, position):
+                    break
+            else:
+                raise RuntimeError("Дірка після видалення вершини не є простим многокутником")
+            # Повертаємо списки так, щоб вухо було між face[-1] і face[0]
+            face, corners = face[position:] + face[:position], corners[position:] + corners[:position]
+            diagonal = arena.connect_edges(face[0], face[-1])  # Від кінця face[0] до початку face[-1]
+            new_edges.append(diagonal)
+            face, corners = face[1:-1] + [arena.symmetric_edge[diagonal]], corners[1:]
+        return new_edges
+
+    def _is_ear(self, corners, position):
+        """Чи є вершина corners[position] вухом многокутника з вершинами corners (проти годинникової стрілки)"""
+        previous_point, tip, next_point = corners[position - 1], corners[position], corners[(position + 1) % len(corners)]
+        if self._point_orientation(self.arena.point(next_point), previous_point, tip) >= 0:
+            return False  # Вершина не строго опукла
+        for corner in corners:
+            if corner in (previous_point, tip, next_point):
+                continue
+            point = self.arena.point(corner)
+            if (self._point_orientation(point, previous_point, tip) <= 0 and
+                    self._point_orientation(point, tip, next_point) <= 0 and
+                    self._point_orientation(point, next_point, previous_point) <= 0):
+                return False
+        return True
+
+    def _legalize(self, edges):
+        """Перевертає ребра, що не задовольняють умову Делоне, доки таких не залишиться"""
+        arena = self.arena
+        symmetric_edge = arena.symmetric_edge
+        while edges:
+            edge = edges.pop()
+            if not arena.alive[edge]:
+                continue
+            symmetric = symmetric_edge[edge]
+            if not (self._is_triangle(edge) and self._is_triangle(symmetric)):
+                continue  # Ребро ОО
+            left_apex, right_apex = self._lnext(edge), self._lnext(symmetric)
+            if self._is_point_in_circumcircle(arena.start_index[edge], arena.end_index(edge),
+                                              arena.end_index(left_apex), arena.end_index(right_apex)):
+                edges += [left_apex, self._lnext(left_apex), right_apex, self._lnext(right_apex)]
+                self._swap(edge)
+
+    def _swap(self, edge):
+        """Замінює діагональ чотирикутника, утвореного двома трикутниками біля ребра edge, на іншу"""
+        arena = self.arena
+        symmetric = arena.symmetric_edge[edge]
+        start_point, end_point = arena.start_index[edge], arena.start_index[symmetric]
+        edge_a, edge_b = arena.prev_edge_cw[edge], arena.prev_edge_cw[symmetric]
+        arena.splice_edges(edge, edge_a)
+        arena.splice_edges(symmetric, edge_b)
+        arena.splice_edges(edge, self._lnext(edge_a))
+        arena.splice_edges(symmetric, self._lnext(edge_b))
+        arena.start_index[edge], arena.start_index[symmetric] = arena.end_index(edge_a), arena.end_index(edge_b)
+        self.vertex_edge[start_point], self.vertex_edge[end_point] = edge_a, edge_b
+
+    def _remove_edge(self, edge):
+        """Видаляє ребро, не залишаючи в vertex_edge посилань на нього"""
+        arena = self.arena
+        for half_edge in (edge, arena.symmetric_edge[edge]):
+            vertex = arena.start_index[half_edge]
+            if self.vertex_edge[vertex] == half_edge:
+                next_edge = arena.next_edge_ccw[half_edge]
+                self.vertex_edge[vertex] = next_edge if next_edge != half_edge else -1
+        arena.remove_edge(edge)
+
+    def _is_flippable(self, edge, allow_collinear=False):
+        """Чи утворюють трикутники з обох боків ребра опуклий чотирикутник.
+        allow_collinear: дозволяє початку ребра лежати на новій діагоналі"""
+        arena = self.arena
+        symmetric = arena.symmetric_edge[edge]
+        if not (self._is_triangle(edge) and self._is_triangle(symmetric)):
+            return False
+        left_apex, right_apex = arena.end_index(self._lnext(edge)), arena.end_index(self._lnext(symmetric))
+        start_side = self._point_orientation(arena.point(arena.start_index[edge]), right_apex, left_apex)
+        end_side = self._point_orientation(arena.point(arena.start_index[symmetric]), right_apex, left_apex)
+        return start_side * end_side < 0 or (allow_collinear and start_side == 0 and end_side != 0)
+
+    def _is_triangle(self, edge):
+        """Чи є грань ліворуч від ребра edge трикутником (а не зовнішньою гранню)"""
+        next_edge = self._lnext(edge)
+        last_edge = self._lnext(next_edge)
+        if self._lnext(last_edge) != edge:
+            return False
+        return self._orientation(self.arena.point(self.arena.end_index(next_edge)), edge) < 0
+
+    def _face_edges(self, edge):
+        """Ребра грані ліворуч від ребра edge"""
+        face = [edge]
+        next_edge = self._lnext(edge)
+        while next_edge != edge:
+            face.append(next_edge)
+            next_edge = self._lnext(next_edge)
+        return face
+
+    def _vertex_ring(self, vertex):
+        """Ребра, що виходять з вершини vertex, у порядку проти годинникової стрілки"""
+        first_edge = self.vertex_edge[vertex]
+        ring = [first_edge]
+        next_edge = self.arena.next_edge_ccw[first_edge]
+        while next_edge != first_edge:
+            ring.append(next_edge)
+            next_edge = self.arena.next_edge_ccw[next_edge]
+        return ring
+
+    def _lnext(self, edge):
+        """Наступне ребро грані ліворуч від ребра edge"""
+        return self.arena.prev_edge_cw[self.arena.symmetric_edge[edge]]
+
+    def _lprev(self, edge):
+        """Попереднє ребро грані ліворуч від ребра edge"""
+        return self.arena.symmetric_edge[self.arena.next_edge_ccw[edge]]
+
+    def _orientation(self, point, edge):
+        """Визначник положення точки з координатами point відносно ребра edge"""
+        return self._point_orientation(point, self.arena.start_index[edge], self.arena.end_index(edge))
+
+    def _is_point_in_circumcircle(self, point_a, point_b, point_c, point_d):
+        """Чи лежить вершина point_d всередині описаного кола навколо трикутника point_a, point_b, point_c"""
+        points = self.arena.points
+        return incircle(points[2 * point_a], points[2 * point_a + 1], points[2 * point_b], points[2 * point_b + 1],
+                        points[2 * point_c], points[2 * point_c + 1], points[2 * point_d], points[2 * point_d + 1]) < 0
+
+    def _point_orientation(self, point, start_point, end_point):
+        """Додатний, якщо point праворуч від прямої start_point -> end_point, від'ємний, якщо ліворуч"""
+        points = self.arena.points
+        return orient2d(points[2 * start_point], points[2 * start_point + 1],
+                        points[2 * end_point], points[2 * end_point + 1], point[0], point[1])
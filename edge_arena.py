@@ -0,0 +1,192 @@
+from array import array
+from contextlib import contextmanager
+
+import numpy as np
+
+
+class EdgeArena:
+    """Сховище ребер у вигляді попередньо виділених цілочисельних масивів.
+    Ребро e та його симетричне ребро займають пару сусідніх комірок (парна та непарна),
+    точки задаються індексами в одному масиві координат points = [x0, y0, x1, y1, ...].
+    Цілочисельні координати (масив points цілого типу) зберігаються як int32 (або int64, якщо не вміщуються)"""
+
+    def __init__(self, points, capacity=None):
+        points = np.asarray(points)
+        if np.issubdtype(points.dtype, np.integer):
+            fits_int32 = not points.size or (points.min() >= -2 ** 31 and points.max() < 2 ** 31)
+            typecode = 'i' if fits_int32 else 'q'
+        else:
+            typecode = 'd'
+        points = np.ascontiguousarray(points, dtype=typecode).reshape(-1)
+        self.points = array(typecode)  # Координати точок, до яких звертаються за індексом
+        self.points.frombytes(points.tobytes())
+        self.point_tuples = None  # Список кортежів (x, y) на час побудови (див. unpacked_points)
+        if capacity is None:
+            capacity = 6 * max(len(self.points) // 2, 2)  # Не більше 3n ребер, тобто 6n орієнтованих ребер
+        capacity += capacity % 2  # Ребра виділяються парами
+
+        self.start_index = array('i', [0]) * capacity  # Індекс початкової точки ребра
+        self.symmetric_edge = array('i', [0]) * capacity  # Індекс симетричного ребра
+        self.next_edge_ccw = array('i', [0]) * capacity  # Наступне ребро в кільці (проти годинникової стрілки)
+        self.prev_edge_cw = array('i', [0]) * capacity  # Попереднє ребро в кільці (за годинниковою стрілкою)
+        self.alive = bytearray(capacity)  # 1, якщо ребро належить триангуляції
+
+        self.edge_count = 0  # Кількість уже використаних комірок
+        self.created_edges = 0  # Скільки разів викликано create_new_edge
+        self.free_edge = -1  # Перша пара у списку вільних пар (зв'язаних через next_edge_ccw)
+
+    def __len__(self):
+        """Кількість точок у сховищі"""
+        return len(self.points) // 2
+
+    @property
+    def capacity(self):
+        return len(self.start_index)
+
+    def end_index(self, edge):
+        """Індекс кінцевої точки ребра edge"""
+        return self.start_index[self.symmetric_edge[edge]]
+
+    @property
+    def is_integer(self):
+        return self.points.typecode != 'd'
+
+    def coordinates(self):
+        """Масив numpy (N, 2), що спільно з arena використовує буфер координат"""
+        return np.frombuffer(self.points, dtype=self.points.typecode).reshape(-1, 2)
+
+    @contextmanager
+    def unpacked_points(self):
+        """На час блоку point_tuples - список кортежів (x, y) з координатами точок. Предикати побудови читають
+        точку одним зверненням до списку замість двох до array, кожне з яких ще й створює новий об'єкт числа.
+        Координати int32 переводяться у float (точно), бо фільтр предикатів для float швидший за арифметику
+        довгих цілих; int64 лишаються цілими. Ціна - близько 110 байтів на точку, лише доки виконується блок"""
+        if self.point_tuples is not None:  # Уже розпаковано зовнішнім блоком
+            yield
+            return
+        coordinates = self.coordinates()
+        if self.points.typecode == 'i':
+            coordinates = coordinates.astype(np.float64)
+        self.point_tuples = list(map(tuple, coordinates.tolist()))
+        del coordinates  # Звільняємо буфер self.points
+        try:
+            yield
+        finally:
+            self.point_tuples = None
+
+    def point(self, index):
+        """Координати точки з індексом index"""
+        return self.points[2 * index], self.points[2 * index + 1]
+
+    def reset(self, points):
+        """Замінює точки сховища на points (з тим самим типом координат) і звільняє всі ребра.
+        Масиви ребер лишаються виділеними, тож одне сховище придатне для багатьох невеликих триангуляцій"""
+        del self.points[:]
+        self.points.frombytes(np.ascontiguousarray(points, dtype=self.points.typecode).tobytes())
+        self.point_tuples = None
+        self.edge_count = 0
+        self.created_edges = 0
+        self.free_edge = -1
+
+    def add_point(self, x, y):
+        """Додає точку в кінець масиву координат і повертає її індекс"""
+        self.points.append(x)
+        self.points.append(y)
+        return len(self.points) // 2 - 1
+
+    def grow(self, extra=None):
+        """Збільшує масиви ребер на extra комірок (за замовчуванням удвічі)"""
+        extra = extra or max(self.capacity, 2)
+        extra += extra % 2
+        for edges in (self.start_index, self.symmetric_edge, self.next_edge_ccw, self.prev_edge_cw):
+            edges.frombytes(bytes(edges.itemsize * extra))
+        self.alive.extend(bytes(extra))
+
+    def create_new_edge(self, start_point, end_point):
+        """Створює нове ребро між точками з індексами start_point та end_point"""
+        next_edge_ccw, prev_edge_cw = self.next_edge_ccw, self.prev_edge_cw
+        edge = self.free_edge
+        if edge >= 0:
+            self.free_edge = next_edge_ccw[edge]  # Повторно використовуємо вільну пару; symmetric_edge у ній уже заповнено
+            symmetric_edge = edge + 1
+        else:
+            edge = self.edge_count
+            if edge == len(self.start_index):
+                self.grow()  # Масиви розширюються на місці, локальні імена лишаються дійсними
+            self.edge_count = edge + 2
+            symmetric_edge = edge + 1
+            self.symmetric_edge[edge], self.symmetric_edge[symmetric_edge] = symmetric_edge, edge
+        self.created_edges += 1
+
+        self.start_index[edge], self.start_index[symmetric_edge] = start_point, end_point
+        next_edge_ccw[edge], prev_edge_cw[edge] = edge, edge
+        next_edge_ccw[symmetric_edge], prev_edge_cw[symmetric_edge] = symmetric_edge, symmetric_edge
+        self.alive[edge] = self.alive[symmetric_edge] = 1
+        return edge
+
+    def splice_edges(self, edge_a, edge_b):
+        """Об'єднує різні кільця ребер або розриває одне кільце на дві частини"""
+        if edge_a == edge_b:
+            return
+
+        next_edge_ccw, prev_edge_cw = self.next_edge_ccw, self.prev_edge_cw
+        next_a, next_b = next_edge_ccw[edge_a], next_edge_ccw[edge_b]
+        prev_edge_cw[next_a], prev_edge_cw[next_b] = edge_b, edge_a
+        next_edge_ccw[edge_a], next_edge_ccw[edge_b] = next_b, next_a
+
+    def connect_edges(self, edge_a, edge_b):
+        """Додає нове ребро, що з'єднує кінцеву точку edge_a з початковою точкою edge_b"""
+        start_index, symmetric_a = self.start_index, edge_a ^ 1  # Симетричне ребро - сусідня комірка пари
+        new_edge = self.create_new_edge(start_index[symmetric_a], start_index[edge_b])
+        self.splice_edges(new_edge, self.prev_edge_cw[symmetric_a])
+        self.splice_edges(new_edge + 1, edge_b)
+        return new_edge
+
+    def remove_edge(self, edge):
+        """Видаляє ребро та повертає його пару комірок у список вільних"""
+        symmetric_edge = edge ^ 1
+        self.splice_edges(edge, self.prev_edge_cw[edge])
+        self.splice_edges(symmetric_edge, self.prev_edge_cw[symmetric_edge])
+        edge &= ~1  # Перша комірка пари
+        self.alive[edge] = self.alive[edge + 1] = 0
+        self.next_edge_ccw[edge] = self.free_edge
+        self.free_edge = edge
+
+    def append_edges(self, start_index, next_edge_ccw, prev_edge_cw):
+        """Дописує стиснуті пари ребер з іншого сховища (масиви numpy без вільних комірок)
+        і повертає зсув, який додано до їхніх індексів"""
+        offset, count = self.edge_count, len(start_index)
+        if offset + count > self.capacity:
+            self.grow(offset + count - self.capacity)
+        edges = slice(offset, offset + count)
+        self.start_index[edges] = array('i', np.asarray(start_index, dtype=np.intc).tobytes())
+        self.symmetric_edge[edges] = array('i', (np.arange(offset, offset + count, dtype=np.intc) ^ 1).tobytes())
+        self.next_edge_ccw[edges] = array('i', (np.asarray(next_edge_ccw, dtype=np.intc) + offset).tobytes())
+        self.prev_edge_cw[edges] = array('i', (np.asarray(prev_edge_cw, dtype=np.intc) + offset).tobytes())
+        self.alive[edges] = b'\x01' * count
+        self.edge_count += count
+        self.created_edges += count // 2
+        return offset
+
+    def compact_edges(self):
+        """Масиви start_index, next_edge_ccw, prev_edge_cw лише для живих ребер (пари йдуть підряд)
+        та відображення старих індексів ребер у нові"""
+        live = self.live_edges()
+        edges = np.column_stack((live, live + 1)).reshape(-1)
+        new_index = np.full(self.edge_count, -1, dtype=np.intc)
+        new_index[edges] = np.arange(len(edges), dtype=np.intc)
+        start_index = np.frombuffer(self.start_index, dtype=np.intc, count=self.edge_count)[edges]
+        next_edge_ccw = new_index[np.frombuffer(self.next_edge_ccw, dtype=np.intc, count=self.edge_count)[edges]]
+        prev_edge_cw = new_index[np.frombuffer(self.prev_edge_cw, dtype=np.intc, count=self.edge_count)[edges]]
+        return start_index, next_edge_ccw, prev_edge_cw, new_index
+
+    def live_edges(self):
+        """Масив numpy з індексами живих ребер (по одному на кожну пару)"""
+        alive = np.frombuffer(self.alive, dtype=np.uint8, count=self.edge_count)
+        return np.flatnonzero(alive[::2]) * 2
+
+    def edge_index_pairs(self):
+        """Масив (M, 2) з індексами кінців кожного живого ребра"""
+        edges = self.live_edges()
+        start_index = np.frombuffer(self.start_index, dtype=np.intc, count=self.edge_count)
+        return np.column_stack((start_index[edges], start_index[edges + 1]))
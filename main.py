@@ -7,7 +7,6 @@ from visualisation_configuration import *
 import visualisation_configuration as vis_config
 
 from triangulation_visualizer import TriangulationVisualizer
-from delaunay_triangulation import compute_delaunay_edges
 
 
 def wrap_text(text, font, max_width):
@@ -33,7 +32,7 @@ def generate_random_points(width, height, num_points):
     """Повертає масив випадково згенерованих точок"""
     points_x = np.random.randint(0, width, num_points, dtype=np.int64)  # Випадкові координати x
     points_y = np.random.randint(0, height, num_points, dtype=np.int64)  # Випадкові координати y
-    return np.asarray(list(zip(points_x, points_y)), dtype=np.float64)  # Об'єднуємо координати в масив точок
+    return np.column_stack((points_x, points_y)).astype(np.float64)  # Об'єднуємо координати в масив точок
 
 
 def setup_pygame():
@@ -88,12 +87,11 @@ def handle_ui_events(event, gen_button, run_button, clear_button, point_input, e
         auto_run = False
         try:
             num_points = int(point_input.get_text())
-            if num_points < 1 or num_points > 10000:
-                raise ValueError("Кількість точок має бути між 1 та 10000")
+            if num_points < 1 or num_points > 1000000:
+                raise ValueError("Кількість точок має бути між 1 та 1000000")
             error_message.set_text('')
-            mesh.add_corner_points()
-            mesh.points_list += generate_random_points(vis_config.window_width - 250, vis_config.window_height, num_points).tolist()
-            mesh.edges_list = []
+            mesh.set_points(mesh.corner_points() +
+                            generate_random_points(vis_config.window_width - 250, vis_config.window_height, num_points).tolist())
             mesh.draw(vis_config.window)
         except ValueError as e:
             wrapped_text = '\n'.join(wrap_text(str(e), font, 200))  # Wrap text
@@ -103,7 +101,7 @@ def handle_ui_events(event, gen_button, run_button, clear_button, point_input, e
         if event.ui_element == run_button:
             auto_run = True
             if len(mesh.points_list) >= 2:
-                mesh.edges_list = compute_delaunay_edges(np.array(mesh.points_list, dtype=np.float64))
+                mesh.triangulate_in_background()
                 mesh.draw(vis_config.window)
             else:
                 error_message.set_text("Недостатньо точок для запуску алгоритму")
@@ -117,21 +115,34 @@ def handle_ui_events(event, gen_button, run_button, clear_button, point_input, e
 def handle_mouse_events(event, mesh, auto_run):
     """Обробка подій миші"""
     pos = pygame.mouse.get_pos()
+    if event.button not in (1, 3):  # Коліщатко та середня кнопка керують виглядом (handle_view_events)
+        return
     if pos[0] < vis_config.window_width - 250:  # Перевірка, щоб точка не додавалась/видалялась на панелі
+        if not auto_run and (mesh.triangulation is not None or mesh.triangulator.busy):
+            mesh.reset_triangulation()  # Без автозапуску ребра застарілої триангуляції прибираються
         if event.button == 1:  # Ліва кнопка миші
-            mesh.points_list.append(pos)
+            mesh.add_point(pos)  # Триангуляція, якщо вона є, оновлюється локально
         elif event.button == 3:  # Права кнопка миші
             mesh.remove_point(pos)
-        if auto_run:
-            if len(mesh.points_list) >= 2:
-                mesh.edges_list = compute_delaunay_edges(np.array(mesh.points_list, dtype=np.float64))
-            else:
-                mesh.edges_list = []
-        else:
-            mesh.edges_list = []
+        if auto_run and mesh.triangulation is None:
+            mesh.triangulate_in_background()  # Новий набір точок замінює запит, що ще виконується
         mesh.draw(vis_config.window)
 
 
+def handle_view_events(event, mesh):
+    """Масштабування коліщатком миші та зсув перетягуванням із затиснутою середньою кнопкою"""
+    pos = pygame.mouse.get_pos()
+    if pos[0] >= vis_config.window_width - 250:
+        return
+    if event.type == MOUSEWHEEL and event.y:
+        mesh.zoom(ZOOM_FACTOR ** event.y, pos)
+    elif event.type == MOUSEMOTION and event.buttons[1]:
+        mesh.pan(*event.rel)
+    else:
+        return
+    mesh.draw(vis_config.window)
+
+
 def main():
     manager, clock = setup_pygame()
     panel, gen_button, run_button, clear_button, point_input, error_message = create_ui_elements(manager)
@@ -148,14 +159,19 @@ def main():
         time_delta = clock.tick(60) / 1000.0
         for event in pygame.event.get():
             if event.type == QUIT or (event.type == KEYDOWN and event.key == K_ESCAPE):
+                vis_config.mesh.reset_triangulation()  # Зупиняємо фоновий процес
                 pygame.quit()
                 return
             if event.type == pygame_gui.UI_BUTTON_PRESSED:
                 auto_run = handle_ui_events(event, gen_button, run_button, clear_button, point_input, error_message, vis_config.mesh, auto_run, font)
             if event.type == MOUSEBUTTONDOWN:
                 handle_mouse_events(event, vis_config.mesh, auto_run)
+            if event.type in (MOUSEWHEEL, MOUSEMOTION):
+                handle_view_events(event, vis_config.mesh)
 
             manager.process_events(event)
+        if vis_config.mesh.poll_triangulation():  # Проміжні та готові результати фонової побудови
+            vis_config.mesh.draw(vis_config.window)
         manager.update(time_delta)
         manager.draw_ui(vis_config.window)
         pygame.display.update()
@@ -0,0 +1,126 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from edge_arena import EdgeArena
+from array_delaunay_triangulation import arena_edges, is_integer_array, sort_unique_points, delaunay_triangulate, merge_halves
+
+
+def compute_delaunay_edges(points, workers=None, strip_size=None, integer=None):
+    """Повертає список ребер триангуляції Делоне, обчисленої паралельно смугами.
+    workers: кількість процесів (за замовчуванням усі ядра), strip_size: найбільша кількість точок у смузі
+    integer=True: координати цілі, обчислення точні в цілих числах (None - якщо points мають цілий тип)"""
+    if integer is None:
+        integer = is_integer_array(points)
+    points, _ = sort_unique_points(points, integer)
+    arena = triangulate_points(points, workers, strip_size)
+    return arena_edges(points, arena)
+
+
+def triangulate_points(points, workers=None, strip_size=None):
+    """Будує триангуляцію Делоне для відсортованих унікальних точок і повертає EdgeArena з її ребрами.
+    Смуги - це вузли того самого дерева поділу, що й у послідовному алгоритмі, тому, зшиваючи їх
+    у тому ж порядку, отримуємо ті самі ребра, що й array_delaunay_triangulation.triangulate_points"""
+    workers = workers or os.cpu_count()
+    count = len(points)
+    if strip_size is None:
+        strip_size = -(-count // (4 * workers))  # Приблизно чотири смуги на процес
+    strip_size = max(strip_size, 3)  # Менші підзадачі алгоритм не ділить
+
+    strips = split_strips(count, strip_size)
+    if workers == 1 or len(strips) == 1:
+        arena = EdgeArena(points)
+        if count >= 2:
+            delaunay_triangulate(arena)
+        return arena
+
+    shared = shared_memory.SharedMemory(create=True, size=max(points.nbytes, 1))
+    try:
+        shared_points = np.ndarray((count, 2), dtype=points.dtype, buffer=shared.buf)
+        shared_points[:] = points
+        del shared_points
+        firsts, lasts = zip(*strips)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(triangulate_strip, repeat(shared.name), repeat(count), firsts, lasts,
+                                    repeat(points.dtype.str)))
+    finally:
+        shared.close()
+        shared.unlink()
+    return assemble_strips(points, strips, results, strip_size)
+
+
+def assemble_strips(points, strips, results, strip_size):
+    """Збирає триангульовані смуги (результати triangulate_strip_points) в одне сховище,
+    зсуваючи індекси точок і ребер, і зшиває їх; повертає EdgeArena"""
+    arena = EdgeArena(points, capacity=6 * len(points))
+    strip_handles = {}
+    for (first, _), (start_index, next_edge_ccw, prev_edge_cw, left_edge, right_edge, created_edges) in zip(strips, results):
+        offset = arena.append_edges(start_index + first, next_edge_ccw, prev_edge_cw)
+        arena.created_edges += created_edges - len(start_index) // 2  # Враховуємо ребра, видалені в смузі
+        strip_handles[first] = (left_edge + offset, right_edge + offset)
+
+    merge_strips(arena, strip_handles, len(points), strip_size)
+    return arena
+
+
+def split_strips(count, strip_size):
+    """Ділить діапазон 0..count-1 так само, як послідовний алгоритм, доки частини більші за strip_size.
+    Повертає список пар (first, last) у порядку зростання x"""
+    strips, ranges = [], [(0, count)]
+    while ranges:
+        first, last = ranges.pop()
+        if last - first <= strip_size:
+            strips.append((first, last))
+            continue
+        midpoint = first + (last - first + 1) // 2
+        ranges += [(midpoint, last), (first, midpoint)]
+    return strips
+
+
+def triangulate_strip(shared_name, count, first, last, dtype='<f8'):
+    """Триангулює смугу точок first..last-1 зі спільної пам'яті (виконується в окремому процесі).
+    dtype - тип координат у спільній пам'яті (цілі координати обробляються точно)"""
+    shared = shared_memory.SharedMemory(name=shared_name)
+    try:
+        points = np.ndarray((count, 2), dtype=dtype, buffer=shared.buf)
+        arena = EdgeArena(points[first:last])
+        del points
+    finally:
+        shared.close()
+    return triangulate_strip_arena(arena)
+
+
+def triangulate_strip_points(points):
+    """Триангулює смугу відсортованих унікальних точок points"""
+    return triangulate_strip_arena(EdgeArena(points))
+
+
+def triangulate_strip_arena(arena):
+    """Триангулює точки arena. Повертає стиснуті масиви ребер (пари йдуть підряд),
+    ребра left_edge, right_edge у нумерації цих масивів і кількість створених ребер"""
+    left_edge, right_edge = delaunay_triangulate(arena)
+    start_index, next_edge_ccw, prev_edge_cw, new_index = arena.compact_edges()
+    return (start_index, next_edge_ccw, prev_edge_cw, int(new_index[left_edge]), int(new_index[right_edge]),
+            arena.created_edges)
+
+
+def merge_strips(arena, strip_handles, count, strip_size):
+    """Зшиває готові смуги знизу вгору по дереву поділу; повертає ребра left_edge і right_edge"""
+    with arena.unpacked_points():  # Як у delaunay_triangulate: предикати читають координати зі списку
+        tasks = [(0, count, False)]  # (first, last, merge_pending)
+        handles = []
+        while tasks:
+            first, last, merge_pending = tasks.pop()
+            if merge_pending:
+                right_inner_edge, right_outer_edge = handles.pop()
+                left_outer_edge, left_inner_edge = handles.pop()
+                handles.append(merge_halves(arena, left_outer_edge, left_inner_edge, right_inner_edge, right_outer_edge))
+            elif last - first <= strip_size:
+                handles.append(strip_handles[first])
+            else:
+                midpoint = first + (last - first + 1) // 2
+                tasks += [(first, last, True), (midpoint, last, False), (first, midpoint, False)]
+    return handles.pop()
@@ -0,0 +1,121 @@
+import math
+
+import numpy as np
+
+
+class PointGrid:
+    """Рівномірна сітка для пошуку найближчої точки, що підтримує додавання та видалення точок.
+    Кожна точка зберігається разом з ідентифікатором (наприклад, індексом у списку точок).
+    Розмір клітинки підбирається так, щоб у клітинці було в середньому кілька точок;
+    коли точок стає значно більше, сітка перебудовується"""
+
+    def __init__(self, points=(), ids=None):
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        ids = range(len(points)) if ids is None else ids
+        self._build(points, list(ids))
+
+    def __len__(self):
+        return self.count
+
+    def _build(self, points, ids):
+        """Розкладає точки points з ідентифікаторами ids по клітинках"""
+        self.count = len(points)
+        self.built_count = max(self.count, 16)
+        extent = points.max(axis=0) - points.min(axis=0) if self.count else np.zeros(2)
+        # Клітинка площею приблизно дві точки, але не дрібніша за 1/4096 розміру області
+        self.cell_size = max(math.sqrt(2 * extent[0] * extent[1] / max(self.count, 1)), extent.max() / 4096, 1e-9)
+        self.cells = {}  # (стовпчик, рядок) -> список [x, y, id]
+        self.lower_cell, self.upper_cell = [math.inf, math.inf], [-math.inf, -math.inf]  # Межі зайнятих клітинок
+        if not self.count:
+            return
+
+        # Групуємо точки за клітинками одним сортуванням
+        cells = np.floor(points / self.cell_size).astype(np.int64)
+        order = np.lexsort((cells[:, 1], cells[:, 0]))
+        cells = cells[order]
+        items = [list(item) for item in zip(*points[order].T.tolist(), [ids[index] for index in order.tolist()])]
+        starts = np.flatnonzero(np.any(cells[1:] != cells[:-1], axis=1)) + 1
+        bounds = zip([0] + starts.tolist(), starts.tolist() + [self.count])
+        for cell, (start, end) in zip(map(tuple, cells[np.r_[0, starts]].tolist()), bounds):
+            self.cells[cell] = items[start:end]
+        self.lower_cell, self.upper_cell = cells.min(axis=0).tolist(), cells.max(axis=0).tolist()
+
+    def _rebuild(self):
+        items = [item for cell in self.cells.values() for item in cell]
+        self._build(np.array([item[:2] for item in items], dtype=np.float64).reshape(-1, 2), [item[2] for item in items])
+
+    def cell_of(self, x, y):
+        return math.floor(x / self.cell_size), math.floor(y / self.cell_size)
+
+    def _insert(self, x, y, point_id):
+        cell = self.cell_of(x, y)
+        self.cells.setdefault(cell, []).append([x, y, point_id])
+        self.lower_cell = [min(self.lower_cell[0], cell[0]), min(self.lower_cell[1], cell[1])]
+        self.upper_cell = [max(self.upper_cell[0], cell[0]), max(self.upper_cell[1], cell[1])]
+
+    def add(self, point, point_id):
+        """Додає точку point з ідентифікатором point_id"""
+        self._insert(float(point[0]), float(point[1]), point_id)
+        self.count += 1
+        if self.count > 4 * self.built_count:
+            self._rebuild()
+
+    def remove(self, point, point_id):
+        """Видаляє точку point з ідентифікатором point_id; повертає False, якщо її немає"""
+        x, y = float(point[0]), float(point[1])
+        cell = self.cell_of(x, y)
+        items = self.cells.get(cell, [])
+        for position, item in enumerate(items):
+            if item[2] == point_id and item[0] == x and item[1] == y:
+                items[position] = items[-1]
+                items.pop()
+                if not items:
+                    del self.cells[cell]
+                self.count -= 1
+                return True
+        return False
+
+    def move(self, point, old_id, new_id):
+        """Змінює ідентифікатор точки point"""
+        x, y = float(point[0]), float(point[1])
+        for item in self.cells.get(self.cell_of(x, y), []):
+            if item[2] == old_id and item[0] == x and item[1] == y:
+                item[2] = new_id
+                return True
+        return False
+
+    def nearest(self, point, max_distance=math.inf):
+        """Повертає (x, y, id) найближчої точки, віддаленої не більше ніж на max_distance, або None.
+        Клітинки переглядаються кільцями навколо клітинки point, доки ближча точка ще можлива"""
+        x, y = float(point[0]), float(point[1])
+        column, row = self.cell_of(x, y)
+        best_item, best_distance = None, max_distance * max_distance
+        # Далі цього кільця зайнятих клітинок немає
+        last_ring = max(column - self.lower_cell[0], self.upper_cell[0] - column,
+                        row - self.lower_cell[1], self.upper_cell[1] - row, 0)
+        ring = 0
+        while ring <= last_ring:
+            # Точки в кільці ring віддалені від point щонайменше на (ring - 1) * cell_size
+            if ring and best_distance < ((ring - 1) * self.cell_size) ** 2:
+                break
+            if 8 * ring > len(self.cells):
+                # Порожніх клітинок у кільці більше, ніж зайнятих загалом: переглядаємо всі зайняті
+                cells, last_ring = self.cells.keys(), ring
+            else:
+                cells = self.ring_cells(column, row, ring)
+            for cell in cells:
+                for item in self.cells.get(cell, ()):
+                    distance = (item[0] - x) ** 2 + (item[1] - y) ** 2
+                    if distance <= best_distance:
+                        best_item, best_distance = item, distance
+            ring += 1
+        return tuple(best_item) if best_item is not None else None
+
+    @staticmethod
+    def ring_cells(column, row, ring):
+        """Клітинки на відстані ring (за Чебишевим) від клітинки (column, row)"""
+        if ring == 0:
+            return [(column, row)]
+        cells = [(column + offset, row + side) for side in (-ring, ring) for offset in range(-ring, ring + 1)]
+        cells += [(column + side, row + offset) for side in (-ring, ring) for offset in range(-ring + 1, ring)]
+        return cells
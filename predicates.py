@@ -0,0 +1,134 @@
+from fractions import Fraction
+
+import numpy as np
+
+EPSILON = 2.0 ** -53  # Половина одиниці останнього розряду float64
+ORIENT2D_ERROR_BOUND = (3.0 + 16.0 * EPSILON) * EPSILON  # Оцінки похибок Шевчука (ccwerrboundA, iccerrboundA)
+INCIRCLE_ERROR_BOUND = (10.0 + 96.0 * EPSILON) * EPSILON
+# Межі цілих координат, для яких визначники масивів точок обчислюються в int64 без переповнення
+ORIENT2D_INTEGER_LIMIT = 2 ** 30
+INCIRCLE_INTEGER_LIMIT = 2 ** 13
+
+exact_counts = {'orient2d': 0, 'incircle': 0}  # Скільки разів фільтр не спрацював і знадобилась точна арифметика
+
+
+def reset_exact_counts():
+    """Обнуляє лічильники точних обчислень"""
+    for name in exact_counts:
+        exact_counts[name] = 0
+
+
+def orient2d(ax, ay, bx, by, cx, cy):
+    """Визначник (a - c) x (b - c) з гарантовано правильним знаком.
+    Спочатку рахуємо у float з оцінкою похибки; якщо знак під сумнівом - точно, у раціональних числах"""
+    detleft = (ax - cx) * (by - cy)
+    detright = (ay - cy) * (bx - cx)
+    determinant = detleft - detright
+    if (detleft > 0) != (detright > 0) or detleft == 0 or detright == 0:
+        return determinant  # Доданки різних знаків або нуль: знак різниці точний
+
+    if abs(determinant) >= ORIENT2D_ERROR_BOUND * abs(detleft + detright):
+        return determinant
+    return orient2d_exact(ax, ay, bx, by, cx, cy)
+
+
+def exact_numbers(*values):
+    """Значення як точні числа: цілі числа Python, якщо всі значення цілі (так швидше, ніж у дробах, а цілі сітки
+    якраз найчастіше потрапляють на точний шлях), інакше Fraction (float переходить у Fraction без втрат)"""
+    if all(value == int(value) for value in values):
+        return [int(value) for value in values]
+    return [Fraction(value) for value in values]
+
+
+def orient2d_exact(ax, ay, bx, by, cx, cy):
+    """Знак orient2d (-1, 0 або 1), обчислений точно"""
+    exact_counts['orient2d'] += 1
+    ax, ay, bx, by, cx, cy = exact_numbers(ax, ay, bx, by, cx, cy)
+    determinant = (ax - cx) * (by - cy) - (ay - cy) * (bx - cx)
+    return (determinant > 0) - (determinant < 0)
+
+
+def incircle(ax, ay, bx, by, cx, cy, dx, dy):
+    """Визначник, додатний, якщо d лежить усередині кола через a, b, c (a, b, c проти годинникової стрілки
+    при осі y вгору). Знак гарантовано правильний: при сумнівному результаті рахуємо точно"""
+    adx, ady = ax - dx, ay - dy
+    bdx, bdy = bx - dx, by - dy
+    cdx, cdy = cx - dx, cy - dy
+
+    bdxcdy, cdxbdy = bdx * cdy, cdx * bdy
+    alift = adx * adx + ady * ady
+    cdxady, adxcdy = cdx * ady, adx * cdy
+    blift = bdx * bdx + bdy * bdy
+    adxbdy, bdxady = adx * bdy, bdx * ady
+    clift = cdx * cdx + cdy * cdy
+
+    determinant = alift * (bdxcdy - cdxbdy) + blift * (cdxady - adxcdy) + clift * (adxbdy - bdxady)
+    permanent = ((abs(bdxcdy) + abs(cdxbdy)) * alift +
+                 (abs(cdxady) + abs(adxcdy)) * blift +
+                 (abs(adxbdy) + abs(bdxady)) * clift)
+    if abs(determinant) > INCIRCLE_ERROR_BOUND * permanent:
+        return determinant
+    return incircle_exact(ax, ay, bx, by, cx, cy, dx, dy)
+
+
+def incircle_exact(ax, ay, bx, by, cx, cy, dx, dy):
+    """Знак incircle (-1, 0 або 1), обчислений точно"""
+    exact_counts['incircle'] += 1
+    ax, ay, bx, by, cx, cy, dx, dy = exact_numbers(ax, ay, bx, by, cx, cy, dx, dy)
+    adx, ady, bdx, bdy, cdx, cdy = ax - dx, ay - dy, bx - dx, by - dy, cx - dx, cy - dy
+    determinant = ((adx * adx + ady * ady) * (bdx * cdy - cdx * bdy) +
+                   (bdx * bdx + bdy * bdy) * (cdx * ady - adx * cdy) +
+                   (cdx * cdx + cdy * cdy) * (adx * bdy - bdx * ady))
+    return (determinant > 0) - (determinant < 0)
+
+
+def integer_arrays(arrays, limit):
+    """Цілочисельні масиви координат у типі, в якому визначник обчислюється без переповнення:
+    int64, якщо всі координати за модулем менші за limit, інакше цілі числа Python (dtype=object)"""
+    largest = max((int(np.abs(array).max()) for array in arrays if array.size), default=0)
+    dtype = np.int64 if largest < limit else object
+    return [array.astype(dtype) for array in arrays]
+
+
+def orient2d_signs(a, b, c):
+    """Знаки orient2d для масивів точок a, b, c форми (k, 2): масив -1, 0 або 1.
+    Фільтр як в orient2d, але для всіх рядків одразу; сумнівні рядки рахуються точно по одному.
+    Цілі координати рахуються точно одразу"""
+    if np.issubdtype(a.dtype, np.integer):
+        # Різниці менші за 2^31, добутки - за 2^62
+        a, b, c = integer_arrays((a, b, c), ORIENT2D_INTEGER_LIMIT)
+        return np.sign((a[:, 0] - c[:, 0]) * (b[:, 1] - c[:, 1]) - (a[:, 1] - c[:, 1]) * (b[:, 0] - c[:, 0])).astype(np.int8)
+    detleft = (a[:, 0] - c[:, 0]) * (b[:, 1] - c[:, 1])
+    detright = (a[:, 1] - c[:, 1]) * (b[:, 0] - c[:, 0])
+    signs = np.sign(detleft - detright).astype(np.int8)
+    uncertain = (np.abs(detleft - detright) < ORIENT2D_ERROR_BOUND * np.abs(detleft + detright)) & (detleft * detright > 0)
+    for row in np.flatnonzero(uncertain).tolist():
+        signs[row] = orient2d_exact(*a[row].tolist(), *b[row].tolist(), *c[row].tolist())
+    return signs
+
+
+def incircle_signs(a, b, c, d):
+    """Знаки incircle для масивів точок a, b, c, d форми (k, 2): масив -1, 0 або 1"""
+    if np.issubdtype(a.dtype, np.integer):
+        # Різниці менші за 2^14, тож кожен з трьох доданків менший за 2^58
+        a, b, c, d = integer_arrays((a, b, c, d), INCIRCLE_INTEGER_LIMIT)
+        adx, ady, bdx, bdy, cdx, cdy = (point[:, axis] - d[:, axis] for point in (a, b, c) for axis in (0, 1))
+        return np.sign((adx * adx + ady * ady) * (bdx * cdy - cdx * bdy) +
+                       (bdx * bdx + bdy * bdy) * (cdx * ady - adx * cdy) +
+                       (cdx * cdx + cdy * cdy) * (adx * bdy - bdx * ady)).astype(np.int8)
+    adx, ady = a[:, 0] - d[:, 0], a[:, 1] - d[:, 1]
+    bdx, bdy = b[:, 0] - d[:, 0], b[:, 1] - d[:, 1]
+    cdx, cdy = c[:, 0] - d[:, 0], c[:, 1] - d[:, 1]
+    bdxcdy, cdxbdy = bdx * cdy, cdx * bdy
+    cdxady, adxcdy = cdx * ady, adx * cdy
+    adxbdy, bdxady = adx * bdy, bdx * ady
+    alift, blift, clift = adx * adx + ady * ady, bdx * bdx + bdy * bdy, cdx * cdx + cdy * cdy
+
+    determinant = alift * (bdxcdy - cdxbdy) + blift * (cdxady - adxcdy) + clift * (adxbdy - bdxady)
+    permanent = ((np.abs(bdxcdy) + np.abs(cdxbdy)) * alift +
+                 (np.abs(cdxady) + np.abs(adxcdy)) * blift +
+                 (np.abs(adxbdy) + np.abs(bdxady)) * clift)
+    signs = np.sign(determinant).astype(np.int8)
+    for row in np.flatnonzero(~(np.abs(determinant) > INCIRCLE_ERROR_BOUND * permanent)).tolist():
+        signs[row] = incircle_exact(*a[row].tolist(), *b[row].tolist(), *c[row].tolist(), *d[row].tolist())
+    return signs
@@ -0,0 +1,45 @@
+import numpy as np
+
+from array_delaunay_triangulation import sort_unique_points, triangulate_points
+from batch_delaunay_triangulation import SWEEP_MIN_SETS, triangulate_many, unpack_edges
+
+
+def batch(seed):
+    """Набори решіток (багато точок на одному колі) та випадкових точок різних розмірів"""
+    rng = np.random.default_rng(seed)
+    point_sets = []
+    for _ in range(2 * SWEEP_MIN_SETS):
+        width, height = rng.integers(2, 6, 2)
+        lattice = np.column_stack((np.arange(width * height) % width, np.arange(width * height) // width))
+        point_sets.append(rng.permutation(lattice + rng.integers(-50, 50, 2)).astype(np.float64))
+    point_sets += [rng.random((rng.integers(1, 40), 2)) for _ in range(SWEEP_MIN_SETS)]
+    return [point_sets[index] for index in rng.permutation(len(point_sets))]
+
+
+def test_result_does_not_depend_on_workers():
+    point_sets = batch(0)
+    serial = triangulate_many(point_sets)
+    for workers in (2, 3):
+        packed = triangulate_many(point_sets, workers=workers)
+        assert np.array_equal(packed.offsets, serial.offsets)
+        assert np.array_equal(packed.edges, serial.edges)
+
+
+def test_batch_edge_counts():
+    point_sets = batch(1)
+    for points, edges in zip(point_sets, unpack_edges(triangulate_many(point_sets))):
+        sorted_points, _ = sort_unique_points(points)
+        # Та сама кількість ребер, що й у розділяй і володарюй, і кожне ребро з'єднує різні точки набору
+        expected = len(triangulate_points(sorted_points).edge_index_pairs()) if len(sorted_points) >= 2 else 0
+        assert len(edges) == expected
+        assert not np.any(edges[:, 0] == edges[:, 1])
+
+
+def test_small_group_reuses_arena():
+    # Менше SWEEP_MIN_SETS наборів - кожен триангулюється окремо в одному сховищі; ребра ті самі, що й у нового сховища
+    rng = np.random.default_rng(2)
+    point_sets = [rng.random((rng.integers(8, 16), 2)) for _ in range(SWEEP_MIN_SETS - 1)]
+    for points, edges in zip(point_sets, unpack_edges(triangulate_many(point_sets))):
+        sorted_points, input_index = sort_unique_points(points)
+        expected = input_index[triangulate_points(sorted_points).edge_index_pairs()]
+        assert np.array_equal(edges, expected)
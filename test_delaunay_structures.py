@@ -0,0 +1,62 @@
+import numpy as np
+
+from delaunay_arrays import compute_delaunay_arrays
+from delaunay_structures import convex_hull, minimum_spanning_tree, nearest_neighbors, voronoi_diagram
+
+
+def pairwise_distances(points):
+    return np.sqrt(((points[:, None] - points[None]) ** 2).sum(axis=2))
+
+
+def test_lattice_hull():
+    # Точки на сторонах оболонки теж входять, обхід проти годинникової стрілки від найлівішої найнижчої
+    lattice = np.column_stack((np.arange(12) % 4, np.arange(12) // 4))
+    points = np.random.default_rng(0).permutation(lattice)
+    hull = convex_hull(compute_delaunay_arrays(points))
+    expected = [(0, 0), (1, 0), (2, 0), (3, 0), (3, 1), (3, 2), (2, 2), (1, 2), (0, 2), (0, 1)]
+    assert list(map(tuple, points[hull].tolist())) == expected
+
+
+def test_minimum_spanning_tree_weight():
+    points = np.random.default_rng(1).random((150, 2))
+    tree = minimum_spanning_tree(compute_delaunay_arrays(points))
+    assert len(tree) == len(points) - 1
+    weight = np.sqrt(((points[tree[:, 0]] - points[tree[:, 1]]) ** 2).sum(axis=1)).sum()
+
+    # Алгоритм Прима на повному графі
+    distances = pairwise_distances(points)
+    in_tree = np.zeros(len(points), dtype=bool)
+    in_tree[0] = True
+    best = distances[0].copy()
+    expected = 0.0
+    for _ in range(len(points) - 1):
+        vertex = np.argmin(np.where(in_tree, np.inf, best))
+        expected += best[vertex]
+        in_tree[vertex] = True
+        best = np.minimum(best, distances[vertex])
+    assert np.isclose(weight, expected)
+
+
+def test_nearest_neighbors_with_duplicates():
+    rng = np.random.default_rng(2)
+    points = rng.integers(0, 30, (120, 2))
+    points = np.concatenate((points, points[:10]))[rng.permutation(130)]
+    nearest, distances = nearest_neighbors(compute_delaunay_arrays(points))
+    expected = pairwise_distances(points.astype(np.float64))
+    np.fill_diagonal(expected, np.inf)
+    assert np.allclose(distances, expected.min(axis=1))
+    assert np.all(nearest != np.arange(len(points)))
+    assert np.allclose(expected[np.arange(len(points)), nearest], distances)
+    assert np.count_nonzero(distances == 0) >= 20
+
+
+def test_collinear_voronoi():
+    points = np.array([[0, 0], [2, 4], [1, 2], [3, 6], [1, 2]])
+    delaunay = compute_delaunay_arrays(points)
+    voronoi = voronoi_diagram(delaunay)
+    # Без трикутників: ребра Вороного - прямі, перпендикулярні до прямої точок, між сусідніми точками
+    assert not len(voronoi.vertices)
+    assert sorted(map(sorted, voronoi.ridge_points.tolist())) == [[0, 2], [1, 2], [1, 3]]
+    assert np.all(voronoi.ridge_vertices == -1)
+    assert np.all(voronoi.directions @ np.array([1, 2]) == 0) and np.all(np.any(voronoi.directions != 0, axis=1))
+    assert convex_hull(delaunay).tolist() == [0, 3]
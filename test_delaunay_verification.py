@@ -0,0 +1,38 @@
+import numpy as np
+
+from array_delaunay_triangulation import sort_unique_points, triangulate_points
+from delaunay_arrays import extract_arrays
+from delaunay_verification import check_delaunay
+
+
+def delaunay_arrays(seed=0):
+    points, _ = sort_unique_points(np.random.default_rng(seed).random((200, 2)))
+    return extract_arrays(triangulate_points(points))
+
+
+def test_valid_triangulation():
+    certificate = check_delaunay(delaunay_arrays())
+    assert certificate.valid
+    assert certificate.mismatched_edges.shape == (0, 2)
+
+
+def test_replaced_edge_is_reported():
+    delaunay = delaunay_arrays()
+    edges = np.sort(delaunay.edges, axis=1)
+    # Ребро, якого немає серед сторін трикутників, замість справжнього: кількість ребер не змінюється
+    existing = set(map(tuple, edges.tolist()))
+    spurious = next((0, end) for end in range(1, len(delaunay.points)) if (0, end) not in existing)
+    replaced = edges.copy()
+    replaced[-1] = spurious
+    certificate = check_delaunay(delaunay._replace(edges=replaced))
+    assert not certificate.valid
+    assert sorted(map(tuple, certificate.mismatched_edges.tolist())) == sorted([spurious, tuple(edges[-1])])
+
+
+def test_duplicate_edge_is_reported():
+    delaunay = delaunay_arrays()
+    edges = delaunay.edges.copy()
+    edges[-1] = edges[0]
+    certificate = check_delaunay(delaunay._replace(edges=edges))
+    assert not certificate.valid
+    assert len(certificate.mismatched_edges) == 2  # Записане двічі та пропущене
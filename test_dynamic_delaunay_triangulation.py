@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from dynamic_delaunay_triangulation import DynamicDelaunayTriangulation
+from delaunay_arrays import extract_arrays
+from delaunay_verification import check_delaunay
+
+
+def certificate(triangulation):
+    """check_delaunay для триангуляції без точок, що були видалені (їхні індекси в arena вільні)"""
+    arena = triangulation.arena
+    used = np.ones(len(arena), dtype=bool)
+    used[triangulation.free_points] = False
+    return check_delaunay(extract_arrays(arena, arena.coordinates()[used], np.cumsum(used) - 1))
+
+
+def lattice(width, height):
+    return np.column_stack((np.arange(width * height) % width, np.arange(width * height) // width)).astype(np.float64)
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_lattice_deletes_are_local(seed):
+    # На решітці сусіди вершини лежать на одній прямій або одному колі, тож перевернути ребра часто неможливо
+    points = lattice(25, 25)
+    triangulation = DynamicDelaunayTriangulation(points)
+    build_count = triangulation.build_count
+    for index in np.random.default_rng(seed).permutation(len(points))[:400]:
+        assert triangulation.delete(points[index])
+    assert triangulation.build_count == build_count
+    assert len(triangulation) == len(points) - 400
+    assert certificate(triangulation).valid
+
+
+def test_random_edits_keep_delaunay():
+    rng = np.random.default_rng(11)
+    triangulation = DynamicDelaunayTriangulation(rng.integers(0, 12, (80, 2)))
+    for _ in range(300):
+        point = rng.integers(0, 12, 2)
+        if point in triangulation:
+            triangulation.delete(point)
+        else:
+            triangulation.insert(point)
+        if not triangulation.degenerate:
+            assert certificate(triangulation).valid
@@ -0,0 +1,92 @@
+"""Рушії триангуляції (вертикальні та чергові розрізи, цілий режим, паралельні смуги) мають давати
+ту саму триангуляцію Делоне. Для точок загального положення вона єдина, тож ребра збігаються;
+на решітці (багато точок на одному колі) рушії з тим самим деревом поділу збігаються точно,
+а чергові розрізи можуть вибрати інші діагоналі, але результат усе одно має бути Делоне"""
+import numpy as np
+import pytest
+
+import array_delaunay_triangulation
+import delaunay_triangulation
+import parallel_delaunay_triangulation
+from array_delaunay_triangulation import sort_unique_points, triangulate_points
+from delaunay_arrays import compute_delaunay_arrays, extract_arrays
+from delaunay_verification import check_delaunay
+from triangulation_cache import TriangulationCache
+
+
+def edge_set(arena):
+    """Множина ребер arena як пари індексів відсортованих точок (менший індекс першим)"""
+    return set(map(tuple, np.sort(arena.edge_index_pairs(), axis=1).tolist()))
+
+
+def engine_edge_sets(points):
+    """Ребра кожного рушія для points (точки з цілим типом додатково триангулюються як float)"""
+    integer = np.issubdtype(points.dtype, np.integer)
+    sorted_points, _ = sort_unique_points(points, integer)
+    float_points, _ = sort_unique_points(points.astype(np.float64))
+    return {
+        'vertical': edge_set(triangulate_points(float_points)),
+        'alternating': edge_set(triangulate_points(float_points, 'alternating')),
+        'integer': edge_set(triangulate_points(sorted_points)) if integer else None,
+        'parallel': edge_set(parallel_delaunay_triangulation.triangulate_points(float_points, workers=2, strip_size=40)),
+    }
+
+
+def lattice(width, height):
+    return np.column_stack((np.arange(width * height) % width, np.arange(width * height) // width))
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_engines_match_on_random_points(seed):
+    rng = np.random.default_rng(seed)
+    points = rng.integers(0, 2 ** 20, (600, 2))
+    edges = engine_edge_sets(points)
+    for engine in ('alternating', 'integer', 'parallel'):
+        assert edges[engine] == edges['vertical'], engine
+
+
+def test_engines_match_object_engine():
+    points = np.random.default_rng(7).random((300, 2)) * 1000
+    sorted_points, _ = sort_unique_points(points)
+    expected = {frozenset((tuple(edge.start_point), tuple(edge.end_point)))
+                for edge in delaunay_triangulation.compute_delaunay_edges(points)}
+    edges = {frozenset(map(tuple, sorted_points[list(pair)].tolist()))
+             for pair in edge_set(triangulate_points(sorted_points))}
+    assert edges == expected
+
+
+def test_parallel_detects_integer_points():
+    # Цілі точки, як і в array_delaunay_triangulation, не переводяться у float
+    points = lattice(30, 30) * 3 + 2 ** 40
+    expected = {frozenset((edge.start_point, edge.end_point)) for edge in array_delaunay_triangulation.compute_delaunay_edges(points)}
+    edges = parallel_delaunay_triangulation.compute_delaunay_edges(points, workers=2, strip_size=100)
+    assert {frozenset((edge.start_point, edge.end_point)) for edge in edges} == expected
+    assert all(type(coordinate) is int for edge in edges for coordinate in edge.start_point + edge.end_point)
+
+
+@pytest.mark.parametrize('width, height', [(20, 20), (37, 5), (1, 30)])
+def test_engines_on_lattice(width, height):
+    points = lattice(width, height)
+    edges = engine_edge_sets(points)
+    # Те саме дерево поділу і ті самі знаки предикатів - ті самі ребра
+    assert edges['integer'] == edges['vertical']
+    assert edges['parallel'] == edges['vertical']
+    assert len(edges['alternating']) == len(edges['vertical'])
+    for cut_strategy in ('vertical', 'alternating'):
+        for dtype in (np.int64, np.float64):
+            sorted_points, _ = sort_unique_points(points.astype(dtype), dtype is np.int64)
+            assert check_delaunay(extract_arrays(triangulate_points(sorted_points, cut_strategy))).valid
+
+
+@pytest.mark.parametrize('points', [[[1, 1], [1, 1], [1, 1]], [[2.5, -1], [2.5, -1]], [[3, 4]], np.empty((0, 2))])
+def test_duplicate_only_input(points):
+    # Менше двох різних точок - порожній результат, а не None
+    points = np.array(points)
+    assert array_delaunay_triangulation.compute_delaunay_edges(points) == []
+    assert array_delaunay_triangulation.compute_delaunay_edges(points, 'alternating') == []
+    assert array_delaunay_triangulation.compute_delaunay_edges(points, stats=True)[0] == []
+    assert parallel_delaunay_triangulation.compute_delaunay_edges(points) == []
+    arrays = compute_delaunay_arrays(points)
+    assert len(arrays.edges) == len(arrays.triangles) == 0
+    assert TriangulationCache().compute_delaunay_edges(points) == []
+    assert len(TriangulationCache().compute_delaunay_arrays(points).edges) == 0
@@ -0,0 +1,128 @@
+"""Фільтровані предикати: знак має збігатися з точним (у дробах) і там, де звичайний float помиляється,
+а лічильники exact_counts - показувати, скільки разів фільтр відправив обчислення на точний шлях"""
+from fractions import Fraction
+from itertools import product
+
+import numpy as np
+import pytest
+
+import predicates
+from array_delaunay_triangulation import is_left_of, is_point_in_circumcircle, is_right_of, sort_unique_points, triangulate_points
+from delaunay_arrays import extract_arrays
+from delaunay_verification import check_delaunay
+from edge_arena import EdgeArena
+from predicates import incircle, incircle_signs, orient2d, orient2d_signs
+
+ULP = 2.0 ** -53  # Крок float поблизу 0.5
+
+
+@pytest.fixture(autouse=True)
+def exact_counts():
+    predicates.reset_exact_counts()
+    return predicates.exact_counts
+
+
+def sign(value):
+    return (value > 0) - (value < 0)
+
+
+def exact_orient2d_sign(ax, ay, bx, by, cx, cy):
+    ax, ay, bx, by, cx, cy = map(Fraction, (ax, ay, bx, by, cx, cy))
+    return sign((ax - cx) * (by - cy) - (ay - cy) * (bx - cx))
+
+
+def exact_incircle_sign(ax, ay, bx, by, cx, cy, dx, dy):
+    adx, ady, bdx, bdy, cdx, cdy = (Fraction(value) - Fraction(origin) for value, origin in
+                                    ((ax, dx), (ay, dy), (bx, dx), (by, dy), (cx, dx), (cy, dy)))
+    return sign((adx * adx + ady * ady) * (bdx * cdy - cdx * bdy) +
+                (bdx * bdx + bdy * bdy) * (cdx * ady - adx * cdy) +
+                (cdx * cdx + cdy * cdy) * (adx * bdy - bdx * ady))
+
+
+def near_collinear_points():
+    """Точки на відстані кількох ulp від прямої y = x (приклад Шевчука)"""
+    return [(0.5 + i * ULP, 0.5 + j * ULP) for i, j in product(range(12), repeat=2)]
+
+
+def test_near_collinear_orientation(exact_counts):
+    line = (12.0, 12.0, 24.0, 24.0)
+    naive_errors = 0
+    for x, y in near_collinear_points():
+        expected = exact_orient2d_sign(*line, x, y)
+        assert sign(orient2d(*line, x, y)) == expected
+        naive = (line[0] - x) * (line[3] - y) - (line[1] - y) * (line[2] - x)
+        naive_errors += sign(naive) != expected
+    assert naive_errors  # Без точного шляху знак тут справді буває хибним
+    assert exact_counts['orient2d'] > 0 and exact_counts['incircle'] == 0
+
+
+def test_near_cocircular_incircle(exact_counts):
+    # a, b, c проти годинникової стрілки на одиничному колі; d - на колі, на 1 ulp усередині та назовні
+    circle = (1.0, 0.0, 0.0, 1.0, -1.0, 0.0)
+    assert incircle(*circle, 0.0, -1.0) == 0
+    assert incircle(*circle, 0.0, -1.0 + ULP) > 0
+    assert incircle(*circle, 0.0, -1.0 - 2 * ULP) < 0
+    assert exact_counts['incircle'] == 3
+
+
+def test_offset_grid_signs():
+    """Квадрати цілої решітки, зсунутої на 1e8 з дробовою частиною: чотири вершини майже на одному колі"""
+    offset = 1e8 + 0.1
+    corners = [(offset + x, offset + y) for x, y in ((0, 0), (1, 0), (1, 1), (0, 1), (0.5, 1.5))]
+    for a, b, c, d in product(corners, repeat=4):
+        assert sign(incircle(*a, *b, *c, *d)) == exact_incircle_sign(*a, *b, *c, *d)
+    for a, b, c in product(corners, repeat=3):
+        assert sign(orient2d(*a, *b, *c)) == exact_orient2d_sign(*a, *b, *c)
+
+
+def test_exact_path_for_integer_and_fractional_values():
+    # Точний шлях працює в цілих числах для цілих значень і в дробах для решти; знак той самий
+    big = float(2 ** 60)
+    wide = (0, 0, big, big + 2 ** 8, big, big)  # Добутки за межею 2^53, але значення цілі
+    assert predicates.orient2d_exact(*wide) == exact_orient2d_sign(*wide) != 0
+    fractional = (0.1, 0.1, 0.2, 0.2, 0.1 + 0.2, 0.1 + 0.2)
+    assert predicates.orient2d_exact(*fractional) == exact_orient2d_sign(*fractional)
+    assert predicates.incircle_exact(1, 0, 0, 1, -1, 0, 0, -1) == 0
+
+
+def test_array_signs_match_scalar_predicates():
+    points = np.array(near_collinear_points())
+    line = np.broadcast_to([[12.0, 12.0], [24.0, 24.0]], (len(points), 2, 2))
+    expected = [exact_orient2d_sign(12.0, 12.0, 24.0, 24.0, x, y) for x, y in points.tolist()]
+    assert orient2d_signs(line[:, 0], line[:, 1], points).tolist() == expected
+
+    circle = np.broadcast_to([1.0, 0.0, 0.0, 1.0, -1.0, 0.0], (3, 6))
+    d = np.array([[0.0, -1.0], [0.0, -1.0 + ULP], [0.0, -1.0 - 2 * ULP]])
+    assert incircle_signs(circle[:, 0:2], circle[:, 2:4], circle[:, 4:6], d).tolist() == [0, 1, -1]
+
+
+def test_engine_predicates(exact_counts):
+    """Предикати array_delaunay_triangulation з вбудованим фільтром дають той самий знак, що й predicates"""
+    points = [(12.0, 12.0), (24.0, 24.0)] + near_collinear_points()
+    arena = EdgeArena(np.array(points))
+    with arena.unpacked_points():
+        for point in range(2, len(points)):
+            expected = exact_orient2d_sign(*points[0], *points[1], *points[point])
+            assert is_right_of(arena, point, 0, 1) == (expected > 0)
+            assert is_left_of(arena, point, 0, 1) == (expected < 0)
+    assert exact_counts['orient2d'] > 0
+
+    circle = EdgeArena(np.array([(1.0, 0.0), (0.0, 1.0), (-1.0, 0.0), (0.0, -1.0), (0.0, -1.0 + ULP)]))
+    with circle.unpacked_points():
+        assert not is_point_in_circumcircle(circle, 0, 1, 2, 3)
+        # Знак incircle додатний усередині кола, а is_point_in_circumcircle рахує для обходу за годинниковою стрілкою
+        assert is_point_in_circumcircle(circle, 2, 1, 0, 4)
+    assert exact_counts['incircle'] == 2
+
+
+def test_offset_grid_triangulation(exact_counts):
+    grid = np.stack(np.meshgrid(np.arange(12), np.arange(12)), axis=-1).reshape(-1, 2) + 1e8
+    points, _ = sort_unique_points(grid.astype(np.float64))
+    assert check_delaunay(extract_arrays(triangulate_points(points))).valid
+    assert exact_counts['incircle'] > 0
+
+
+def test_uniform_points_stay_on_float_path(exact_counts):
+    points, _ = sort_unique_points(np.random.default_rng(0).random((500, 2)))
+    triangulate_points(points)
+    assert exact_counts == {'orient2d': 0, 'incircle': 0}
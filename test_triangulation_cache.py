@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from array_delaunay_triangulation import sort_unique_points, triangulate_points
+from delaunay_arrays import compute_delaunay_arrays
+from triangulation_cache import TriangulationCache
+
+
+def random_points(seed, count=200):
+    return np.random.default_rng(seed).random((count, 2))
+
+
+def edge_pairs(arena):
+    return sorted(map(tuple, arena.edge_index_pairs().tolist()))
+
+
+def test_hit_maps_to_input_order():
+    cache = TriangulationCache()
+    points = random_points(0)
+    cache.compute_delaunay_arrays(points)
+    # Переставлені точки з дублікатами мають той самий ключ, а індекси відносяться до нового вхідного масиву
+    rng = np.random.default_rng(1)
+    shuffled = np.concatenate((points, points[rng.integers(0, len(points), 50)]))[rng.permutation(len(points) + 50)]
+    arrays = cache.compute_delaunay_arrays(shuffled)
+    assert cache.metrics()['hits'] == 1
+    expected = compute_delaunay_arrays(shuffled)
+    for name in ('edges', 'triangles', 'neighbors'):
+        assert np.array_equal(getattr(arrays, name), getattr(expected, name))
+
+
+def test_eviction_respects_max_bytes():
+    # Точки, помножені на степінь двійки, мають інші ключі, але ту саму триангуляцію, тож записи однакового розміру
+    points, _ = sort_unique_points(random_points(0))
+    point_sets = [points * 2 ** scale for scale in range(3)]
+    arenas = [triangulate_points(points) for points in point_sets]
+    cache = TriangulationCache()
+    cache.put(arenas[0])
+    cache.max_bytes = 2 * cache.size + cache.size // 2  # Місця вистачає лише для двох записів
+    cache.put(arenas[1])
+    assert cache.get(point_sets[0]) is not None  # Тепер найдавніше використаний запис - другий
+    cache.put(arenas[2])
+    assert cache.size <= cache.max_bytes
+    assert cache.metrics()['evictions'] == 1
+    assert cache.get(point_sets[1]) is None
+    assert cache.get(point_sets[0]) is not None
+
+
+def test_disk_round_trip(tmp_path):
+    points, _ = sort_unique_points(random_points(2))
+    expected = edge_pairs(TriangulationCache(directory=str(tmp_path)).triangulate(points))
+    cache = TriangulationCache(directory=str(tmp_path))
+    arena = cache.get(points)
+    assert arena is not None and edge_pairs(arena) == expected
+    assert cache.metrics()['disk_hits'] == 1
+    assert len(cache) == 1  # Запис із диска потрапляє і в пам'ять
+
+
+def test_returned_arena_is_a_copy():
+    cache = TriangulationCache()
+    points, _ = sort_unique_points(random_points(3))
+    arena = cache.triangulate(points)
+    expected = edge_pairs(arena)
+    for edge in arena.live_edges()[:10].tolist():
+        arena.remove_edge(edge)
+    assert edge_pairs(cache.triangulate(points)) == expected
+    restored = cache.get(points)
+    restored.remove_edge(int(restored.live_edges()[0]))
+    assert edge_pairs(cache.get(points)) == expected
+    with pytest.raises(ValueError):
+        cache.get_edges(cache.key(points))[0][0] = 1  # Записи кешу доступні лише для читання
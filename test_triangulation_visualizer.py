@@ -0,0 +1,69 @@
+import os
+import time
+
+import numpy as np
+import pytest
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')  # Вікно не потрібне: рендерер малює в поверхню поза екраном
+
+import triangulation_visualizer
+import visualisation_configuration as vis_config
+from triangulation_visualizer import TriangulationVisualizer, edge_key
+
+
+@pytest.fixture
+def mesh():
+    vis_config.window_width, vis_config.window_height = vis_config.WINDOW_WIDTH + 250, vis_config.WINDOW_HEIGHT
+    mesh = TriangulationVisualizer()
+    points = np.random.default_rng(0).integers(0, vis_config.WINDOW_HEIGHT, (300, 2)).astype(np.float64)
+    mesh.set_points(mesh.corner_points() + points.tolist())
+    yield mesh
+    mesh.reset_triangulation()
+
+
+def test_point_grid_is_kept_between_edits(mesh):
+    grid = mesh.point_grid
+    mesh.triangulate()
+    mesh.reset_triangulation()
+    mesh.add_point((10.25, 20.75))
+    mesh.triangulate()
+    mesh.remove_point((10.25, 20.75))
+    assert mesh.point_grid is grid
+    assert len(grid) == len(mesh.points_list) == 304
+    assert (10.25, 20.75) not in map(tuple, mesh.points_list)
+
+
+def test_reset_keeps_rendered_points(mesh):
+    mesh.triangulate()
+    mesh.reset_triangulation()
+    assert not len(mesh.renderer.edges)
+    grid = mesh.renderer.points.grid
+    # Точка, додана після побудови сітки рендерера, зберігається окремо від неї
+    mesh.add_point((5.5, 6.5))
+    mesh.reset_triangulation()
+    mesh.remove_point((5.5, 6.5))
+    assert mesh.renderer.points.grid is grid
+    assert len(mesh.renderer.points) == len(mesh.points_list) == 304
+
+
+def wait_for_triangulation(mesh):
+    while mesh.triangulator.busy:
+        mesh.poll_triangulation()
+        time.sleep(0.01)
+
+
+def test_background_cache_hit(mesh, monkeypatch):
+    monkeypatch.setattr(triangulation_visualizer, 'BACKGROUND_MIN_POINTS', 100)
+    mesh.triangulate_in_background()
+    wait_for_triangulation(mesh)
+    edges = {edge_key(edge) for edge in mesh.triangulation.edge_array().tolist()}
+    assert mesh.cache.metrics()['misses'] == 1
+
+    # Після додавання та видалення точки ключ кешу невідомий, доки його не обчислить фоновий процес
+    mesh.add_point((3.25, 4.25))
+    mesh.remove_point((3.25, 4.25))
+    mesh.triangulate_in_background()
+    mesh.triangulate_in_background()  # Повторний запуск не перезапускає запит
+    wait_for_triangulation(mesh)
+    assert mesh.cache.metrics()['hits'] == 1
+    assert {edge_key(edge) for edge in mesh.renderer.edges.all_items().tolist()} == edges
@@ -0,0 +1,140 @@
+"""Триангуляція точок з файлу без графічного інтерфейсу.
+Вхідні координати відображаються в пам'ять (.npy, сирі двійкові дані) або зчитуються частинами (CSV),
+а ребра й трикутники записуються у вихідні файли частинами.
+
+Приклад:
+    python triangulate_file.py points.npy --edges edges.npy --triangles triangles.npy
+    python triangulate_file.py points.csv --skip-rows 1 --edges edges.bin
+
+Вихідний файл з розширенням .npy має формат numpy, інакше записуються сирі int32 (little-endian):
+пари індексів для ребер і трійки для трикутників (проти годинникової стрілки, вісь y вгору).
+Індекси відносяться до вхідних точок; з дублікатів використовується перша точка"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from itertools import islice
+
+import numpy as np
+
+from array_delaunay_triangulation import CUT_STRATEGIES, sort_unique_points, triangulate_points
+from delaunay_arrays import iter_edge_chunks, iter_triangle_chunks
+import parallel_delaunay_triangulation
+from triangulation_cache import TriangulationCache
+
+CHUNK_SIZE = 1 << 18  # Скільки ребер (рядків CSV) обробляти за раз; від цього залежить додаткова пам'ять
+
+
+def load_points(path, dtype='float64', delimiter=',', skip_rows=0, temp_dir=None):
+    """Повертає масив (N, 2), відображений у пам'ять з файлу path.
+    CSV спершу частинами переписується у тимчасовий двійковий файл (його видаляють, коли масив більше не потрібен)"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.npy':
+        return np.load(path, mmap_mode='r').reshape(-1, 2)
+    if extension in ('.csv', '.txt'):
+        return load_csv(path, delimiter, skip_rows, temp_dir)
+    return np.memmap(path, dtype=dtype, mode='r').reshape(-1, 2)
+
+
+def load_csv(path, delimiter=',', skip_rows=0, temp_dir=None):
+    """Розбирає CSV частинами по CHUNK_SIZE рядків у тимчасовий двійковий файл і відображає його в пам'ять"""
+    with tempfile.NamedTemporaryFile(suffix='.bin', dir=temp_dir, delete=False) as binary, open(path) as text:
+        for _ in range(skip_rows):
+            next(text, None)
+        while True:
+            lines = list(islice(text, CHUNK_SIZE))
+            if not lines:
+                break
+            chunk = np.loadtxt(lines, dtype=np.float64, delimiter=delimiter, usecols=(0, 1), ndmin=2)
+            binary.write(chunk.tobytes())
+    try:
+        if not os.path.getsize(binary.name):
+            return np.empty((0, 2))
+        return np.memmap(binary.name, dtype=np.float64, mode='r').reshape(-1, 2)
+    finally:
+        os.unlink(binary.name)  # На POSIX відображення залишається доступним до закриття
+
+
+def write_chunks(path, chunks, total, columns, input_index):
+    """Записує частини chunks (масиви індексів точок arena) у файл path, перетворюючи індекси на вхідні.
+    total - загальна кількість рядків (потрібна для заголовка .npy); повертає кількість записаних рядків"""
+    written = 0
+    if path.lower().endswith('.npy'):
+        output = np.lib.format.open_memmap(path, mode='w+', dtype=np.int32, shape=(total, columns))
+        for chunk in chunks:
+            if written + len(chunk) > total:
+                raise RuntimeError("Кількість рядків перевищує очікувану ({})".format(total))
+            output[written:written + len(chunk)] = input_index[chunk]
+            written += len(chunk)
+        output.flush()
+        del output
+    else:
+        with open(path, 'wb') as output:
+            for chunk in chunks:
+                output.write(input_index[chunk].astype('<i4').tobytes())
+                written += len(chunk)
+    if written != total:
+        raise RuntimeError("Записано {} рядків замість {}".format(written, total))
+    return written
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description="Триангуляція Делоне точок з файлу")
+    parser.add_argument('input', help="файл .npy, .csv/.txt або сирі двійкові координати x0 y0 x1 y1 ...")
+    parser.add_argument('--edges', help="вихідний файл для ребер")
+    parser.add_argument('--triangles', help="вихідний файл для трикутників")
+    parser.add_argument('--dtype', default='float64', help="тип сирих двійкових координат")
+    parser.add_argument('--delimiter', default=',', help="роздільник CSV")
+    parser.add_argument('--skip-rows', type=int, default=0, help="скільки рядків заголовка CSV пропустити")
+    parser.add_argument('--temp-dir', help="каталог для тимчасових файлів")
+    parser.add_argument('--cut-strategy', choices=CUT_STRATEGIES, default='vertical')
+    parser.add_argument('--workers', type=int, help="триангулювати паралельно смугами в кількох процесах")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help="скільки ребер записувати за раз")
+    parser.add_argument('--cache-dir', help="каталог кешу триангуляцій: повторні запуски для тих самих точок "
+                                            "беруть ребра звідти")
+    arguments = parser.parse_args(arguments)
+    if not (arguments.edges or arguments.triangles):
+        parser.error("потрібно вказати --edges та/або --triangles")
+
+    start_time = time.perf_counter()
+    points = load_points(arguments.input, arguments.dtype, arguments.delimiter, arguments.skip_rows, arguments.temp_dir)
+    if len(points) < 2:
+        print("Має бути щонайменше дві точки.", file=sys.stderr)
+        return 1
+
+    # Цілі координати (int .npy або --dtype int32) триангулюються точно, без перетворення на float
+    sorted_points, input_index = sort_unique_points(points, np.issubdtype(points.dtype, np.integer))
+    del points
+    point_count = len(sorted_points)
+    # Паралельна побудова дає ті самі ребра, що й послідовна з вертикальними розрізами
+    cut_strategy = 'vertical' if arguments.workers else arguments.cut_strategy
+    cache = TriangulationCache(directory=arguments.cache_dir) if arguments.cache_dir else None
+    arena = cache.get(sorted_points, cut_strategy) if cache is not None else None
+    cached = arena is not None
+    if not cached:
+        if arguments.workers:
+            arena = parallel_delaunay_triangulation.triangulate_points(sorted_points, arguments.workers)
+        else:
+            arena = triangulate_points(sorted_points, cut_strategy)
+        if cache is not None:
+            cache.put(arena, cut_strategy)
+    del sorted_points  # Координати тепер зберігаються в arena
+    input_index = input_index.astype(np.int32)
+
+    edge_count = len(arena.live_edges())
+    # За формулою Ейлера для зв'язного плоского графа: трикутників E - V + 1 (0, якщо всі точки колінеарні)
+    triangle_count = edge_count - point_count + 1
+    if arguments.edges:
+        write_chunks(arguments.edges, iter_edge_chunks(arena, arguments.chunk_size), edge_count, 2, input_index)
+    if arguments.triangles:
+        write_chunks(arguments.triangles, iter_triangle_chunks(arena, arguments.chunk_size), triangle_count, 3, input_index)
+
+    print("{} точок, {} ребер, {} трикутників за {:.2f} с{}".format(
+        point_count, edge_count, triangle_count, time.perf_counter() - start_time, " (з кешу)" if cached else ""),
+        file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
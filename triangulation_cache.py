@@ -0,0 +1,157 @@
+import hashlib
+import os
+import tempfile
+from collections import OrderedDict
+
+import numpy as np
+
+from edge import Edge
+from edge_arena import EdgeArena
+from array_delaunay_triangulation import is_integer_array, sort_unique_points, triangulate_points
+from delaunay_arrays import empty_delaunay_arrays, extract_arrays
+
+DEFAULT_MAX_BYTES = 256 * 2 ** 20  # Близько 3.5 млн точок: ребро займає 24 байти, а ребер не більше 3n
+
+
+class TriangulationCache:
+    """Кеш триангуляцій, адресований вмістом: ключ - хеш відсортованих унікальних координат (та cut_strategy).
+    Зберігаються стиснуті масиви ребер (start_index, next_edge_ccw, prev_edge_cw - як у EdgeArena.compact_edges)
+    в індексах відсортованих точок, тому той самий запис підходить для будь-якого порядку вхідних точок
+    і будь-яких дублікатів. У пам'яті - LRU, обмежений max_bytes; якщо задано directory, записи також
+    зберігаються там файлами .npz і переживають перезапуск"""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, directory=None):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+        self.entries = OrderedDict()  # ключ -> (start_index, next_edge_ccw, prev_edge_cw), найстаріші спочатку
+        self.size = 0  # Скільки байтів займають записи в пам'яті
+        self.hits = 0
+        self.disk_hits = 0  # Влучання, знайдені лише на диску (входять і в hits)
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    @staticmethod
+    def key(points, cut_strategy='vertical'):
+        """Ключ для відсортованих унікальних точок points (результат sort_unique_points).
+        Цілі координати хешуються як int64 незалежно від того, як їх зберігає EdgeArena"""
+        points = np.ascontiguousarray(points, dtype=np.int64 if is_integer_array(points) else np.float64)
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update('{}:{}:{}:'.format(points.dtype.str, len(points), cut_strategy).encode())
+        digest.update(points)
+        return digest.hexdigest()
+
+    def metrics(self):
+        """Лічильники влучань і промахів та заповненість кешу"""
+        lookups = self.hits + self.misses
+        return {'hits': self.hits, 'disk_hits': self.disk_hits, 'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0, 'evictions': self.evictions,
+                'entries': len(self.entries), 'bytes': self.size}
+
+    def clear(self):
+        """Очищує кеш у пам'яті (файли на диску залишаються)"""
+        self.entries.clear()
+        self.size = 0
+
+    def get(self, points, cut_strategy='vertical'):
+        """Повертає нову EdgeArena з триангуляцією відсортованих унікальних точок points або None"""
+        edges = self.get_edges(self.key(points, cut_strategy))
+        return None if edges is None else restore_arena(points, edges)
+
+    def get_edges(self, key):
+        """Стиснуті масиви ребер (start_index, next_edge_ccw, prev_edge_cw) для ключа key або None.
+        Масиви доступні лише для читання; їх можна передати іншому процесу, щоб той відновив EdgeArena"""
+        edges = self.entries.get(key)
+        if edges is not None:
+            self.entries.move_to_end(key)
+        elif self.directory is not None:
+            edges = self._load(key)
+            if edges is not None:
+                self.disk_hits += 1
+                self._remember(key, edges)
+        if edges is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return edges
+
+    def put(self, arena, cut_strategy='vertical'):
+        """Зберігає щойно побудовану триангуляцію arena (точки arena - відсортовані унікальні точки).
+        Записується копія, тож arena можна змінювати далі"""
+        key = self.key(arena.coordinates(), cut_strategy)
+        edges = tuple(np.asarray(edges, dtype=np.int32) for edges in arena.compact_edges()[:3])
+        for array in edges:
+            array.setflags(write=False)
+        if self.directory is not None:
+            self._store(key, edges)
+        self._remember(key, edges)
+
+    def triangulate(self, points, cut_strategy='vertical'):
+        """triangulate_points з кешем: EdgeArena для відсортованих унікальних точок points"""
+        arena = self.get(points, cut_strategy)
+        if arena is None:
+            arena = triangulate_points(points, cut_strategy)
+            self.put(arena, cut_strategy)
+        return arena
+
+    def compute_delaunay_edges(self, points, cut_strategy='vertical', integer=None):
+        """array_delaunay_triangulation.compute_delaunay_edges з кешем"""
+        points, _ = sort_unique_points(points, is_integer_array(points) if integer is None else integer)
+        if len(points) < 2:
+            return []
+        arena = self.triangulate(points, cut_strategy)
+        return [Edge(points[start], points[end]) for start, end in arena.edge_index_pairs()]
+
+    def compute_delaunay_arrays(self, points, cut_strategy='vertical', integer=None):
+        """delaunay_arrays.compute_delaunay_arrays з кешем; індекси відносяться до вхідного масиву points"""
+        if integer is None:
+            integer = is_integer_array(points)
+        sorted_points, input_index = sort_unique_points(points, integer)
+        points = np.asarray(points, dtype=np.int64 if integer else np.float64).reshape(-1, 2)
+        if len(sorted_points) < 2:
+            return empty_delaunay_arrays(points)
+        return extract_arrays(self.triangulate(sorted_points, cut_strategy), points, input_index)
+
+    def _remember(self, key, edges):
+        """Додає запис у LRU, витісняючи найдавніше використані записи, доки не вкладемося в max_bytes"""
+        size = sum(array.nbytes for array in edges)
+        if key in self.entries:
+            self.size -= sum(array.nbytes for array in self.entries.pop(key))
+        if size > self.max_bytes:
+            return  # Такий запис витіснив би все інше; він залишається лише на диску
+        while self.entries and self.size + size > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.size -= sum(array.nbytes for array in evicted)
+            self.evictions += 1
+        self.entries[key] = edges
+        self.size += size
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.npz')
+
+    def _load(self, key):
+        try:
+            with np.load(self._path(key)) as stored:
+                edges = tuple(stored[name] for name in ('start_index', 'next_edge_ccw', 'prev_edge_cw'))
+        except (OSError, KeyError, ValueError):
+            return None  # Файлу немає або він пошкоджений
+        for array in edges:
+            array.setflags(write=False)
+        return edges
+
+    def _store(self, key, edges):
+        # Записуємо в тимчасовий файл і перейменовуємо, щоб інші процеси не прочитали недописаний файл
+        with tempfile.NamedTemporaryFile(dir=self.directory, suffix='.tmp', delete=False) as output:
+            np.savez(output, start_index=edges[0], next_edge_ccw=edges[1], prev_edge_cw=edges[2])
+        os.replace(output.name, self._path(key))
+
+
+def restore_arena(points, edges):
+    """Нова EdgeArena для відсортованих унікальних точок points зі стиснутих масивів ребер edges"""
+    arena = EdgeArena(points, capacity=max(len(edges[0]), 6 * max(len(points), 2)))
+    arena.append_edges(*edges)
+    return arena
@@ -0,0 +1,263 @@
+import numpy as np
+import pygame
+
+from visualisation_configuration import *
+
+
+class SpatialGrid:
+    """Рівномірна сітка для пошуку об'єктів (ребер або точок), обмежувальні прямокутники яких
+    перетинають заданий прямокутник. Об'єкт, не більший за клітинку, записується в клітинку свого центру;
+    більші об'єкти зберігаються окремо і перевіряються всі"""
+
+    def __init__(self, lower, upper):
+        self.lower, self.upper = lower, upper  # Кути обмежувальних прямокутників, масиви (M, 2)
+        count = len(lower)
+        self.origin = lower.min(axis=0) if count else np.zeros(2)
+        extent = upper.max(axis=0) - self.origin if count else np.zeros(2)
+        # Приблизно по кілька об'єктів на клітинку, але не менше за розмір майже всіх об'єктів:
+        # інакше великими виявляються, наприклад, довші за середнє ребра, і кожен запит перевіряє їх усі
+        sizes = np.maximum(upper[:, 0] - lower[:, 0], upper[:, 1] - lower[:, 1]) if count else np.zeros(1)
+        typical_size = np.partition(sizes, int(0.99 * (len(sizes) - 1)))[int(0.99 * (len(sizes) - 1))]
+        self.cell_size = max(2 * np.sqrt(extent[0] * extent[1] / max(count, 1)), typical_size, extent.max() / 1024, 1e-9)
+        self.columns, self.rows = (extent // self.cell_size).astype(np.int64) + 1
+
+        is_small = sizes[:count] <= self.cell_size
+        self.large_items = np.flatnonzero(~is_small)
+        small_items = np.flatnonzero(is_small)
+        cells = self.cell_of((lower[small_items] + upper[small_items]) / 2)
+        order = np.argsort(cells)
+        self.items = small_items[order]  # Об'єкти, впорядковані за клітинками
+        self.cell_start = np.searchsorted(cells[order], np.arange(self.columns * self.rows + 1))
+
+    def cell_of(self, positions):
+        """Номери клітинок для масиву (M, 2) координат"""
+        column, row = self.cell_coordinates(positions).T
+        return row * self.columns + column
+
+    def cell_coordinates(self, positions):
+        cells = ((positions - self.origin) // self.cell_size).astype(np.int64)
+        return np.clip(cells, 0, (self.columns - 1, self.rows - 1))
+
+    def query(self, lower, upper):
+        """Індекси об'єктів, обмежувальні прямокутники яких перетинають прямокутник lower..upper"""
+        lower, upper = np.asarray(lower, dtype=np.float64), np.asarray(upper, dtype=np.float64)
+        # Центр малого об'єкта, що перетинає прямокутник, лежить не далі половини клітинки від нього
+        (first_column, first_row), (last_column, last_row) = self.cell_coordinates(
+            np.array([lower - self.cell_size / 2, upper + self.cell_size / 2]))
+        ranges = [self.items[self.cell_start[row * self.columns + first_column]:self.cell_start[row * self.columns + last_column + 1]]
+                  for row in range(first_row, last_row + 1)]
+        candidates = np.concatenate(ranges + [self.large_items])
+        overlaps = np.all((self.lower[candidates] <= upper) & (self.upper[candidates] >= lower), axis=1)
+        return candidates[overlaps]
+
+
+class DynamicSpatialGrid:
+    """SpatialGrid для масиву об'єктів (точок (N, 2) або відрізків (M, 2, 2)), що підтримує додавання та видалення.
+    Видалені об'єкти лише позначаються, а додані зберігаються окремим невеликим масивом і перевіряються всі;
+    коли таких змін накопичується більше за частку 1/REBUILD_FRACTION від усіх об'єктів, сітка будується заново.
+    Тож одна зміна коштує в середньому O(1) побудов сітки на об'єкт, а не повну перебудову"""
+
+    REBUILD_FRACTION = 16
+    MIN_CHANGES = 1024  # Стільки змін допускається без перебудови навіть для маленьких масивів
+
+    def __init__(self, shape):
+        self.shape = shape  # Форма одного об'єкта: (2,) для точок, (2, 2) для відрізків
+        self.set(np.empty((0,) + shape))
+
+    def __len__(self):
+        return len(self.items) - self.removed_count + len(self.added)
+
+    def set(self, items):
+        """Замінює всі об'єкти масивом items"""
+        self.items = np.asarray(items, dtype=np.float64).reshape((-1,) + self.shape)
+        self.removed = np.zeros(len(self.items), dtype=bool)
+        self.removed_count = 0
+        self.added = np.empty((0,) + self.shape)
+        self.grid = SpatialGrid(*self.bounds(self.items))
+
+    def bounds(self, items):
+        """Обмежувальні прямокутники об'єктів items: пара масивів (M, 2)"""
+        corners = items.reshape(len(items), int(np.prod(self.shape)) // 2, 2)
+        lower = upper = corners[:, 0]
+        # Попарні np.minimum і np.maximum значно швидші за min і max уздовж короткої осі
+        for corner in range(1, corners.shape[1]):
+            lower, upper = np.minimum(lower, corners[:, corner]), np.maximum(upper, corners[:, corner])
+        return lower, upper
+
+    def all_items(self):
+        return np.concatenate((self.items[~self.removed], self.added))
+
+    def add(self, items):
+        items = np.asarray(items, dtype=np.float64).reshape((-1,) + self.shape)
+        self.added = np.concatenate((self.added, items))
+        self._rebuild_if_needed()
+
+    def remove(self, items):
+        """Видаляє по одній копії кожного з об'єктів items (відсутні пропускаються)"""
+        for item in np.asarray(items, dtype=np.float64).reshape((-1,) + self.shape):
+            lower, upper = self.bounds(item[None])
+            candidates = self.grid.query(lower[0], upper[0])
+            candidates = candidates[~self.removed[candidates]]
+            matches = candidates[np.all((self.items[candidates] == item).reshape(len(candidates), item.size), axis=1)]
+            if len(matches):
+                self.removed[matches[0]] = True
+                self.removed_count += 1
+                continue
+            matches = np.flatnonzero(np.all((self.added == item).reshape(len(self.added), item.size), axis=1))
+            if len(matches):
+                self.added = np.delete(self.added, matches[0], axis=0)
+        self._rebuild_if_needed()
+
+    def query(self, lower, upper):
+        """Об'єкти, обмежувальні прямокутники яких перетинають прямокутник lower..upper"""
+        candidates = self.grid.query(lower, upper)
+        added_lower, added_upper = self.bounds(self.added)
+        overlaps = np.all((added_lower <= upper) & (added_upper >= lower), axis=1)
+        return np.concatenate((self.items[candidates[~self.removed[candidates]]], self.added[overlaps]))
+
+    def _rebuild_if_needed(self):
+        if self.removed_count + len(self.added) > max(len(self.items) // self.REBUILD_FRACTION, self.MIN_CHANGES):
+            self.set(self.all_items())
+
+
+def clip_segments(start, end, lower, upper):
+    """Відсікає відрізки start->end прямокутником lower..upper (Лян - Барскі).
+    Повертає індекси відрізків, що перетинають прямокутник, та кінці їхніх видимих частин"""
+    direction = end - start
+    t_enter, t_exit = np.zeros(len(start)), np.ones(len(start))
+    visible = np.ones(len(start), dtype=bool)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for axis in (0, 1):
+            for p, q in ((-direction[:, axis], start[:, axis] - lower[axis]), (direction[:, axis], upper[axis] - start[:, axis])):
+                visible &= (p != 0) | (q >= 0)  # Паралельний межі відрізок лежить ззовні
+                ratio = q / p
+                t_enter = np.where(p < 0, np.maximum(t_enter, ratio), t_enter)
+                t_exit = np.where(p > 0, np.minimum(t_exit, ratio), t_exit)
+    visible &= t_enter <= t_exit
+    segments = np.flatnonzero(visible)
+    start, direction = start[segments], direction[segments]
+    return segments, start + direction * t_enter[segments, None], start + direction * t_exit[segments, None]
+
+
+def rasterize_segments(start, end, lower, upper):
+    """Пікселі відрізків start->end (екранні координати) у прямокутнику lower..upper: масиви x та y.
+    Уздовж головної осі відрізка береться кожна ціла координата, друга координата округлюється.
+    Пікселі залежать лише від самого відрізка, а не від прямокутника, тому області,
+    перемальовані окремо, зшиваються без розривів"""
+    # Відрізок, що проходить на відстані до півпікселя від прямокутника, після округлення може в нього потрапити
+    segments, clipped_start, clipped_end = clip_segments(start, end, lower - 0.5, upper + 0.5)
+    start, end = start[segments], end[segments]
+    direction = end - start
+    major = (np.abs(direction[:, 1]) > np.abs(direction[:, 0])).astype(np.int64)  # Головна вісь кожного відрізка
+    rows = np.arange(len(start))
+    first = np.ceil(np.minimum(clipped_start, clipped_end)[rows, major]).astype(np.int64)
+    last = np.floor(np.maximum(clipped_start, clipped_end)[rows, major]).astype(np.int64)
+    steps = np.maximum(last - first + 1, 0)
+    segment = np.repeat(rows, steps)
+    major_coordinate = np.repeat(first - np.cumsum(steps) + steps, steps) + np.arange(steps.sum())
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = np.nan_to_num(direction[rows, 1 - major] / direction[rows, major])
+    minor_coordinate = np.rint(start[segment, 1 - major[segment]] +
+                               (major_coordinate - start[segment, major[segment]]) * slope[segment]).astype(np.int64)
+    # Після округлення піксель може вийти за межу прямокутника на одиницю
+    pixels = np.empty((len(segment), 2), dtype=np.int64)
+    is_x_major = major[segment] == 0
+    pixels[:, 0] = np.where(is_x_major, major_coordinate, minor_coordinate)
+    pixels[:, 1] = np.where(is_x_major, minor_coordinate, major_coordinate)
+    inside = np.all((pixels >= lower) & (pixels <= upper), axis=1)
+    return pixels[inside, 0], pixels[inside, 1]
+
+
+class TriangulationRenderer:
+    """Малює точки та ребра у кешований шар (поверхню поза екраном) і копіює у вікно лише змінені області.
+    Ребра задаються масивом (M, 2, 2) координат, точки - масивом (N, 2); обидва індексуються
+    сітками DynamicSpatialGrid, тож перемальовується лише те, що потрапляє у видиму область,
+    а окремі точки й ребра можна додавати та видаляти без перебудови всього індексу.
+    Перетворення координат: екранна = (світова - offset) * scale"""
+
+    def __init__(self, size):
+        self.size = size  # Розмір області малювання у пікселях
+        self.layer = pygame.Surface(size, depth=32)  # Кешований шар з фоном, ребрами та точками
+        self.scale = 1.0
+        self.offset = np.zeros(2)
+        self.points = DynamicSpatialGrid((2,))
+        self.edges = DynamicSpatialGrid((2, 2))
+        self.dirty_rects = [self.layer.get_rect()]  # Області шару, які потрібно перемалювати
+        disc = np.mgrid[-POINT_SIZE:POINT_SIZE + 1, -POINT_SIZE:POINT_SIZE + 1].reshape(2, -1)
+        self.disc = disc[:, (disc ** 2).sum(axis=0) <= POINT_SIZE ** 2]  # Зміщення пікселів точки
+
+    def invalidate(self, lower=None, upper=None):
+        """Позначає для перемальовування прямокутник lower..upper світових координат (None - увесь шар)"""
+        if lower is None:
+            self.dirty_rects = [self.layer.get_rect()]
+            return
+        margin = POINT_SIZE + 1
+        (left, top), (right, bottom) = self.world_to_screen(np.array([lower, upper]))
+        rect = pygame.Rect(int(left) - margin, int(top) - margin,
+                           int(right - left) + 2 * margin + 1, int(bottom - top) + 2 * margin + 1)
+        rect = rect.clip(self.layer.get_rect())
+        if rect.width and rect.height:
+            self.dirty_rects.append(rect)
+
+    def world_to_screen(self, positions):
+        return (np.asarray(positions, dtype=np.float64) - self.offset) * self.scale
+
+    def screen_to_world(self, position):
+        x, y = np.asarray(position, dtype=np.float64) / self.scale + self.offset
+        return float(x), float(y)
+
+    def zoom(self, factor, position):
+        """Масштабує вигляд у factor разів відносно екранної точки position"""
+        anchor = np.array(self.screen_to_world(position))
+        self.scale *= factor
+        self.offset = anchor - np.asarray(position, dtype=np.float64) / self.scale
+        self.invalidate()
+
+    def pan(self, dx, dy):
+        """Зсуває вигляд на (dx, dy) пікселів; перемальовуються лише смуги, що відкрились"""
+        dx, dy = int(dx), int(dy)
+        self.offset -= np.array([dx, dy]) / self.scale
+        self.layer.scroll(dx, dy)
+        self.dirty_rects = [rect.move(dx, dy).clip(self.layer.get_rect()) for rect in self.dirty_rects]
+        width, height = self.size
+        if dx:
+            self.dirty_rects.append(pygame.Rect(0 if dx > 0 else width + dx, 0, abs(dx), height))
+        if dy:
+            self.dirty_rects.append(pygame.Rect(0, 0 if dy > 0 else height + dy, width, abs(dy)))
+
+    def draw(self, window_surface):
+        """Перемальовує змінені області шару, копіює їх у вікно та оновлює лише ці області дисплея"""
+        rects = [rect for rect in self.dirty_rects if rect.width > 0 and rect.height > 0]
+        if self.layer.get_rect() in rects:
+            rects = [self.layer.get_rect()]
+        self.dirty_rects = []
+        for rect in rects:
+            self.render(rect)
+            window_surface.blit(self.layer, rect, rect)
+        pygame.display.update(rects)
+        return rects
+
+    def render(self, rect):
+        """Малює фон, ребра та точки в прямокутнику rect шару"""
+        self.layer.fill(BACKGROUND_COLOR, rect)
+        screen_lower = np.array([rect.left, rect.top], dtype=np.float64)
+        screen_upper = np.array([rect.right - 1, rect.bottom - 1], dtype=np.float64)
+        world_lower, world_upper = screen_lower / self.scale + self.offset, screen_upper / self.scale + self.offset
+
+        pixels = pygame.surfarray.pixels2d(self.layer)  # Доступ до пікселів шару за індексом [x, y]
+        try:
+            half_pixel = 0.5 / self.scale
+            edges = self.edges.query(world_lower - half_pixel, world_upper + half_pixel)
+            x, y = rasterize_segments(self.world_to_screen(edges[:, 0]), self.world_to_screen(edges[:, 1]),
+                                      screen_lower, screen_upper)
+            pixels[x, y] = self.layer.map_rgb(LINE_COLOR)
+
+            # Точки на межі прямокутника частково потрапляють у нього, тому розширюємо пошук
+            margin = (POINT_SIZE + 1) / self.scale
+            points = self.world_to_screen(self.points.query(world_lower - margin, world_upper + margin))
+            x = (np.rint(points[:, 0])[:, None].astype(np.int64) + self.disc[0]).reshape(-1)
+            y = (np.rint(points[:, 1])[:, None].astype(np.int64) + self.disc[1]).reshape(-1)
+            inside = (x >= rect.left) & (x < rect.right) & (y >= rect.top) & (y < rect.bottom)
+            pixels[x[inside], y[inside]] = self.layer.map_rgb(POINT_COLOR)
+        finally:
+            del pixels  # Знімаємо блокування поверхні
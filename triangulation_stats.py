@@ -0,0 +1,131 @@
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import wraps
+from time import perf_counter
+
+import array_delaunay_triangulation
+from edge_arena import EdgeArena
+
+COUNTED_FUNCTIONS = ['is_point_in_circumcircle', 'is_right_of', 'is_left_of', 'triangulate_three_points']  # Функції модуля, для яких рахуємо виклики
+COUNTED_METHODS = ['create_new_edge', 'remove_edge', 'connect_edges', 'splice_edges']  # Методи EdgeArena
+TIMED_PHASES = {  # Фаза -> функція модуля, час якої до неї відноситься
+    'sort': 'sort_unique_points',
+    'base_cases': 'triangulate_leaf',
+    'tangent': 'compute_upper_common_tangent',
+    'merge': 'merge',
+    'hull_walk': 'find_extreme_edges',
+}
+
+
+class TriangulationStats:
+    """Статистика одного запуску compute_delaunay_edges(..., stats=True)"""
+
+    def __init__(self):
+        self.phase_times = defaultdict(float)  # Фаза -> сумарний час, с (разом з накладними витратами вимірювання)
+        self.call_counts = defaultdict(int)  # Функція -> кількість викликів
+        self.merge_iterations = defaultdict(int)  # Глибина поділу -> ітерації циклу в merge
+        self.merge_deletions = defaultdict(int)  # Глибина поділу -> ребра, видалені в merge
+        self.edges_created = 0  # Усього викликів create_new_edge
+        self.edges_allocated = 0  # Використані пари комірок EdgeArena
+        self.edges_surviving = 0  # Ребра результату
+        self.edges_garbage = 0  # Пари, що залишились у списку вільних
+        self._merge_depths = iter(())
+
+    def record_arena(self, arena):
+        """Записує стан сховища ребер після триангуляції"""
+        self.edges_created = arena.created_edges
+        self.edges_allocated = arena.edge_count // 2
+        self.edges_surviving = len(arena.live_edges())
+        self.edges_garbage = self.edges_allocated - self.edges_surviving
+
+    def as_dict(self):
+        """Статистика у вигляді словника (для JSON)"""
+        return {
+            'phase_times': dict(self.phase_times),
+            'call_counts': dict(self.call_counts),
+            'merge_iterations': dict(self.merge_iterations),
+            'merge_deletions': dict(self.merge_deletions),
+            'edges_created': self.edges_created,
+            'edges_allocated': self.edges_allocated,
+            'edges_surviving': self.edges_surviving,
+            'edges_garbage': self.edges_garbage,
+        }
+
+
+def merge_depths(count):
+    """Глибини вузлів дерева поділу в тому порядку, в якому delaunay_triangulate їх зшиває"""
+    tasks = [(count, 0, False)]
+    while tasks:
+        size, depth, merge_pending = tasks.pop()
+        if merge_pending:
+            yield depth
+        elif size > 3:
+            midpoint = (size + 1) // 2
+            tasks += [(size, depth, True), (size - midpoint, depth + 1, False), (midpoint, depth + 1, False)]
+
+
+def counted(stats, name, function):
+    """Обгортка, що рахує виклики function"""
+    call_counts = stats.call_counts
+
+    @wraps(function)
+    def wrapper(*args):
+        call_counts[name] += 1
+        return function(*args)
+    return wrapper
+
+
+def timed(stats, phase, function):
+    """Обгортка, що додає час виконання function до фази phase"""
+    phase_times = stats.phase_times
+
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        start_time = perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            phase_times[phase] += perf_counter() - start_time
+    return wrapper
+
+
+@contextmanager
+def instrumented(stats):
+    """На час блоку підміняє функції array_delaunay_triangulation і методи EdgeArena обгортками,
+    що збирають stats. Поза блоком працюють звичайні функції, тому без статистики накладних витрат немає.
+    Підміна діє на весь процес, тому одночасно може виконуватись лише один такий запуск"""
+    module = array_delaunay_triangulation
+    originals = {name: getattr(module, name) for name in COUNTED_FUNCTIONS + list(TIMED_PHASES.values())}
+    original_methods = {name: getattr(EdgeArena, name) for name in COUNTED_METHODS}
+
+    sort_unique_points, merge = originals['sort_unique_points'], originals['merge']
+
+    def sort_and_plan_depths(points, integer=False):
+        result = sort_unique_points(points, integer)
+        stats._merge_depths = merge_depths(len(result[0]))
+        return result
+
+    def merge_by_depth(arena, base_edge):
+        depth = next(stats._merge_depths, None)
+        created, removed = stats.call_counts['create_new_edge'], stats.call_counts['remove_edge']
+        merge(arena, base_edge)
+        # Кожна ітерація, крім останньої, додає одне перехресне ребро
+        stats.merge_iterations[depth] += stats.call_counts['create_new_edge'] - created + 1
+        stats.merge_deletions[depth] += stats.call_counts['remove_edge'] - removed
+
+    replacements = {name: counted(stats, name, originals[name]) for name in COUNTED_FUNCTIONS}
+    replacements['sort_unique_points'] = sort_and_plan_depths
+    replacements['merge'] = merge_by_depth
+    for phase, name in TIMED_PHASES.items():
+        replacements[name] = timed(stats, phase, replacements.get(name, originals[name]))
+    try:
+        for name, function in replacements.items():
+            setattr(module, name, function)
+        for name in COUNTED_METHODS:
+            setattr(EdgeArena, name, counted(stats, name, original_methods[name]))
+        yield stats
+    finally:
+        for name, function in originals.items():
+            setattr(module, name, function)
+        for name, method in original_methods.items():
+            setattr(EdgeArena, name, method)
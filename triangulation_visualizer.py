@@ -1,44 +1,198 @@
 import numpy as np
-import pygame
 
 from visualisation_configuration import *
 import visualisation_configuration as vis_config
+from array_delaunay_triangulation import sort_unique_points
+from background_triangulation import BackgroundTriangulator, BACKGROUND_MIN_POINTS
+from dynamic_delaunay_triangulation import DynamicDelaunayTriangulation
+from point_grid import PointGrid
+from triangulation_cache import TriangulationCache
+from triangulation_renderer import TriangulationRenderer
 
 
 class TriangulationVisualizer:
     def __init__(self):
         self.points_list = []  # Список для зберігання точок
-        self.edges_list = []  # Список для зберігання ребер
+        self.point_grid = PointGrid()  # Сітка для пошуку точок; ідентифікатор - індекс у points_list
+        self.triangulation = None  # Триангуляція, що оновлюється при додаванні та видаленні точок
+        self.triangulator = BackgroundTriangulator()  # Побудова великих триангуляцій в окремому процесі
+        self.cache = TriangulationCache()  # Повторний запуск для того самого набору точок не перебудовує триангуляцію
+        self.points_key = None  # Ключ кешу для points_list, якщо його вже обчислив фоновий процес
+        self.renderer = TriangulationRenderer((vis_config.window_width - 250, vis_config.window_height))
         self.add_corner_points()  # Додаємо точки по кутах області
 
     def add_corner_points(self):
-        """Додає точки по кутах області"""
-        self.points_list = [
+        """Замінює всі точки точками по кутах області"""
+        self.set_points(self.corner_points())
+
+    @staticmethod
+    def corner_points():
+        """Точки по кутах області"""
+        return [
             (0, 0),
             (0, vis_config.window_height),  # Нижній лівий кут
             (vis_config.window_width - 250, 0),  # Верхній правий кут (враховуємо ширину панелі)
             (vis_config.window_width - 250, vis_config.window_height)  # Нижній правий кут (враховуємо ширину панелі)
         ]
-        self.edges_list = []  # Очищуємо список ребер
 
-    def draw(self, window_surface):
-        """Малює точки та ребра на екрані"""
-        window_surface.fill(BACKGROUND_COLOR)  # Заповнюємо фон світло-сірим кольором
+    def set_points(self, points):
+        """Замінює всі точки списком points і відкидає триангуляцію. Лише тут сітка точок будується заново:
+        окремі точки додаються до неї та видаляються з неї в add_point та remove_point"""
+        self.points_list = list(points)
+        self.points_key = None
+        self.point_grid = PointGrid(self.points_list)
+        self.renderer.points.set(self.points_list)
+        self.renderer.invalidate()
+        self.reset_triangulation()
+
+    def triangulate(self):
+        """Будує триангуляцію для всіх точок (або бере її з кешу); далі вона оновлюється локально"""
+        points = np.asarray(self.points_list, dtype=np.float64).reshape(-1, 2)
+        unique_points, _ = sort_unique_points(points)
+        arena = self.cache.triangulate(unique_points) if len(unique_points) >= 2 else None
+        self.triangulation = DynamicDelaunayTriangulation(points, arena)
+        self.show_edges(self.triangulation.edge_array())
+
+    def triangulate_in_background(self):
+        """Запускає побудову триангуляції у фоновому процесі. Результати забирає poll_triangulation;
+        невеликі набори точок триангулюються одразу. Якщо ключ кешу для точок відомий і триангуляція є в кеші,
+        процес лише відновлює її з кешу: навіть це для великих наборів надто довго робити в циклі подій"""
+        if len(self.points_list) < BACKGROUND_MIN_POINTS:
+            self.triangulator.cancel()
+            self.triangulate()
+            return
+        if self.triangulator.busy:
+            return  # Зміна точок скасовує запит, тож поточний запит будує триангуляцію саме цих точок
+        cached_edges = self.cache.get_edges(self.points_key) if self.points_key is not None else None
+        self.reset_triangulation()
+        self.triangulator.submit(self.points_list, cached_edges)
 
-        # Малюємо ребра
-        for edge in self.edges_list:
-            pygame.draw.line(window_surface, LINE_COLOR, edge.start_point, edge.end_point, 1)  # Чорні лінії
+    def poll_triangulation(self):
+        """Показує смуги, які вже триангулював фоновий процес, і встановлює готову триангуляцію.
+        Повертає True, якщо зображення змінилось"""
+        messages = self.triangulator.poll()
+        for message in messages:
+            if message[0] == 'key':
+                # Ключ обчислено у фоновому процесі, тож точки не сортуються в циклі подій.
+                # Якщо він був відомий ще до запуску, у кеші його вже шукали
+                if message[1] != self.points_key:
+                    self.points_key = message[1]
+                    cached_edges = self.cache.get_edges(self.points_key)
+                    if cached_edges is not None:
+                        self.triangulator.submit(self.points_list, cached_edges)
+                        break  # Решта повідомлень - від скасованого запиту
+            elif message[0] == 'strip':
+                self.renderer.edges.add(message[1])
+                self.invalidate(message[1].reshape(-1, 2))
+            elif message[0] == 'done':
+                self.triangulation = message[1]
+                if len(self.triangulation) >= 2 and self.points_key not in self.cache.entries:
+                    self.cache.put(self.triangulation.arena)  # Ще не змінена локальними оновленнями
+                self.show_edges(message[2])
+            else:
+                print("Не вдалося побудувати триангуляцію: {}".format(message[1]))
+        return bool(messages)
 
-        # Малюємо точки
-        for point in self.points_list:
-            pygame.draw.circle(window_surface, POINT_COLOR, (int(point[0]), int(point[1])), POINT_SIZE)  # Червоні точки
+    def reset_triangulation(self):
+        """Відкидає триангуляцію (і скасовує її фонову побудову) та прибирає ребра, якщо вони показані.
+        Точки не змінюються: рендерер і сітка точок оновлюються в add_point та remove_point"""
+        self.triangulator.cancel()
+        self.triangulation = None
+        if len(self.renderer.edges):
+            self.show_edges(np.empty((0, 2, 2)))
 
-        pygame.display.flip()  # Оновлюємо дисплей
+    def show_edges(self, edges):
+        """Показує ребра edges (масив (M, 2, 2)) замість усіх ребер рендерера і перемальовує все"""
+        self.renderer.edges.set(edges)
+        self.renderer.invalidate()
+
+    def invalidate(self, changed_points):
+        """Перемальовує обмежувальний прямокутник точок changed_points"""
+        changed_points = np.asarray(changed_points, dtype=np.float64).reshape(-1, 2)
+        self.renderer.invalidate(changed_points.min(axis=0), changed_points.max(axis=0))
+
+    def update_triangulation(self, edit, point):
+        """Виконує edit (insert або delete) для триангуляції й оновлює в рендерері лише змінені ребра.
+        Вставка змінює лише ребра між точкою та її новими сусідами і між цими сусідами, видалення -
+        між точкою та її колишніми сусідами і між ними, тож досить порівняти ребра серед цих точок до і після"""
+        changed_points = [point] + self.triangulation.neighbors(point)
+        build_count = self.triangulation.build_count
+        edit(point)
+        if self.triangulation.build_count != build_count:
+            # Після побудови з нуля зміни можуть бути не локальними
+            self.show_edges(self.triangulation.edge_array())
+            return
+        changed_points += self.triangulation.neighbors(point)
+        affected = set(map(tuple, changed_points))
+        lower, upper = np.min(changed_points, axis=0), np.max(changed_points, axis=0)
+        # Ребра рендерера зберігаються в тому напрямку, в якому їх передали, тому запам'ятовуємо його
+        old_edges = {edge_key(edge): edge for edge in self.renderer.edges.query(lower, upper).tolist()
+                     if tuple(edge[0]) in affected and tuple(edge[1]) in affected}
+        new_edges = {edge_key((vertex, neighbor)) for vertex in affected
+                     for neighbor in self.triangulation.neighbors(vertex) if neighbor in affected}
+        self.renderer.edges.remove([old_edges[edge] for edge in old_edges.keys() - new_edges])
+        self.renderer.edges.add(list(new_edges - old_edges.keys()))
+        self.invalidate(changed_points)
+
+    def add_point(self, position):
+        """Додає точку в екранній позиції position і, якщо триангуляція побудована, вставляє точку в неї"""
+        point = self.renderer.screen_to_world(position)
+        self.points_list.append(point)
+        self.point_grid.add(point, len(self.points_list) - 1)
+        self.renderer.points.add(point)
+        self.points_key = None
+        if self.triangulation is not None:
+            self.update_triangulation(self.triangulation.insert, point)
+        else:
+            self.triangulator.cancel()  # Фонова побудова (якщо є) - для попереднього набору точок
+            self.invalidate([point])
+
+    def draw(self, window_surface):
+        """Копіює на екран змінені області зображення точок та ребер"""
+        self.renderer.draw(window_surface)
+
+    def zoom(self, factor, position):
+        """Масштабує зображення відносно екранної позиції position"""
+        self.renderer.zoom(factor, position)
+
+    def pan(self, dx, dy):
+        """Зсуває зображення на (dx, dy) пікселів"""
+        self.renderer.pan(dx, dy)
 
     def remove_point(self, position):
-        """Видаляє точку, найближчу до позиції (position), якщо вона існує"""
-        removal_threshold = POINT_SIZE * 2  # Допустима область для видалення точки
-        for point in self.points_list:
-            if abs(point[0] - position[0]) < removal_threshold and abs(point[1] - position[1]) < removal_threshold:
-                self.points_list.remove(point)
-                break
+        """Видаляє точку, найближчу до екранної позиції (position), якщо вона існує"""
+        position = self.renderer.screen_to_world(position)
+        removal_threshold = POINT_SIZE * 2 / self.renderer.scale  # Допустима область для видалення точки
+        nearest = self.point_grid.nearest(position, removal_threshold * 2 ** 0.5)
+        if nearest is None:
+            return
+        x, y, index = nearest
+        if abs(x - position[0]) >= removal_threshold or abs(y - position[1]) >= removal_threshold:
+            return
+
+        # Переносимо останню точку на місце видаленої, щоб не зсувати список
+        point, last_point = self.points_list[index], self.points_list[-1]
+        self.point_grid.remove(point, index)
+        if index != len(self.points_list) - 1:
+            self.point_grid.move(last_point, len(self.points_list) - 1, index)
+        self.points_list[index] = last_point
+        self.points_list.pop()
+        self.renderer.points.remove(point)
+        self.points_key = None
+        if self.triangulation is not None:
+            self.update_triangulation(self.triangulation.delete, point)
+        else:
+            self.triangulator.cancel()  # Фонова побудова (якщо є) - для попереднього набору точок
+            self.invalidate([point])
+
+    def find_triangle(self, position):
+        """Трикутник триангуляції, що містить екранну позицію position (None, якщо його немає)"""
+        if self.triangulation is None:
+            return None
+        return self.triangulation.find_triangle(self.renderer.screen_to_world(position))
+
+
+def edge_key(edge):
+    """Ребро як пара кортежів координат кінців, упорядкованих так, щоб однакові ребра мали однаковий ключ"""
+    start, end = tuple(edge[0]), tuple(edge[1])
+    return (start, end) if start <= end else (end, start)
@@ -6,3 +6,4 @@ BACKGROUND_COLOR = (211, 211, 211)  # світло-сірий колір фон
 POINT_SIZE = 2  # розмір точки
 POINT_COLOR = (255, 0, 0)  # червоний колір точок
 LINE_COLOR = (0, 0, 0)  # чорний колір ліній
+ZOOM_FACTOR = 1.25  # у скільки разів змінюється масштаб за один крок коліщатка миші